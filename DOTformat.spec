@@ -28,7 +28,6 @@ candidate_libs = [
     'qrcode',
     'pydub',
     'speech_recognition',
-    'img2pdf',
     'pikepdf',
     'rembg',               # optional - may be absent
 ]
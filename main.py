@@ -1,4 +1,7 @@
+import multiprocessing
 from src.gui import main
 # Run with:  python main.py
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Needed for process pools in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+    main()
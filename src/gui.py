@@ -8,10 +8,12 @@ import traceback
 from pathlib import Path
 from src.models.convert_image import ImageConverter
 from src.models.pdf_manager import pdf_to_docx, pdf_to_png, protect_pdf
-from src.models.audio_to_text import convert_audio_to_text, SUPPORTED_EXTENSIONS
+from src.models.audio_to_text import convert_audio_to_text, needs_ffmpeg, SUPPORTED_EXTENSIONS
+from src.models.stt_backends import BACKENDS as STT_BACKENDS, DEFAULT_BACKEND as STT_DEFAULT_BACKEND
+from src.utils.transcript_writers import OUTPUT_EXTENSIONS as TRANSCRIPT_EXTENSIONS
 from src.models.qrcode_generator import generate_qr_code
 from src.models.convert_video import convert_video_choice
-from src.models.remove_background import remove_background
+from src.models.remove_background import remove_background, warm_up_session
 from src.db.auth_connection import init_auth_schema, get_auth_connection
 from src.db.connection import init_schema, DB_FILE
 from src.controllers.log_controller import LogController
@@ -263,11 +265,11 @@ def pdf_manager_action():
         output_dir = filedialog.asksaveasfilename(title="Select the directory to save images", initialdir=(get_setting("last_dir_pdf") or ""))
         if not output_dir:
             return
-        # Ask for image quality (DPI) before conversion
-        def ask_dpi(parent) -> int | None:
+        # Ask for image quality (DPI), page range and resume before conversion
+        def ask_dpi(parent) -> dict | None:
             win = tk.Toplevel(parent)
             win.title("Select image quality")
-            win.geometry("420x200")
+            win.geometry("420x290")
             win.resizable(False, False)
             win.grab_set()
 
@@ -338,11 +340,28 @@ def pdf_manager_action():
             lbl_val.pack(pady=(6,2))
             ttk.Label(win, text="Recommended: 300 DPI", foreground="#008000").pack()
 
+            # Optional page range (blank = whole document) and resume of a previous export
+            rng = ttk.Frame(win); rng.pack(pady=(8, 2))
+            ttk.Label(rng, text="Pages from").grid(row=0, column=0, padx=(0, 4))
+            first_var = tk.StringVar(value="")
+            ttk.Entry(rng, textvariable=first_var, width=6).grid(row=0, column=1)
+            ttk.Label(rng, text="to").grid(row=0, column=2, padx=4)
+            last_var = tk.StringVar(value="")
+            ttk.Entry(rng, textvariable=last_var, width=6).grid(row=0, column=3)
+            resume_var = tk.BooleanVar(value=False)
+            ttk.Checkbutton(win, text="Skip pages already exported at this quality", variable=resume_var).pack()
+
             selected = {"val": None}
             btns = ttk.Frame(win); btns.pack(pady=10)
             def ok():
                 v = var.get()
-                selected["val"] = v
+                try:
+                    first = int(first_var.get()) if first_var.get().strip() else None
+                    last = int(last_var.get()) if last_var.get().strip() else None
+                except ValueError:
+                    messagebox.showerror("Error", "Page numbers must be whole numbers.", parent=win)
+                    return
+                selected["val"] = {"dpi": v, "first": first, "last": last, "resume": resume_var.get()}
                 try:
                     set_setting("last_pdf_png_dpi", v)
                 except Exception:
@@ -356,14 +375,17 @@ def pdf_manager_action():
             win.wait_window()
             return selected["val"]
 
-        dpi = ask_dpi(pdf_win)
-        if dpi is None:
+        opts = ask_dpi(pdf_win)
+        if opts is None:
             return
         try:
             success, msg = run_with_progress(
                 "Exporting pages as PNG",
-                lambda _ : pdf_to_png(pdf_file, output_dir, dpi),
-                auto=True
+                lambda report: pdf_to_png(
+                    pdf_file, output_dir, opts["dpi"], progress=report,
+                    first_page=opts["first"], last_page=opts["last"], resume=opts["resume"]
+                ),
+                auto=False
             )
             if success:
                 _conversion_service.log_success("pdf_to_png", pdf_file, output_dir, username=current_user)
@@ -461,12 +483,12 @@ def pdf_manager_action():
 
 
 def audio_to_text_action():
-    """Transcribe selected audio file to text file."""
+    """Transcribe a selected audio file, or every audio file in a folder, to text."""
     # Ask for language first
-    def ask_language(parent) -> str | None:
+    def ask_language(parent) -> tuple[str, bool, str] | None:
         win = tk.Toplevel(parent)
         win.title("Select the audio language")
-        win.geometry("340x150")
+        win.geometry("340x300")
         win.resizable(False, False)
         win.grab_set()
         ttk.Label(win, text="Select the audio language").pack(pady=(12, 6))
@@ -480,13 +502,32 @@ def audio_to_text_action():
         var = tk.StringVar(value=saved if saved in langs else 'pt-BR')
         cb = ttk.Combobox(frm, textvariable=var, values=langs, state='readonly', width=24)
         cb.grid(row=0, column=0, padx=6)
+        # Recognition engine (stored in the stt_backend setting)
+        ttk.Label(win, text="Recognition engine").pack(pady=(8, 2))
+        engines = {cls.label: name for name, cls in STT_BACKENDS.items() if cls.user_selectable}
+        saved_engine = get_setting("stt_backend") or STT_DEFAULT_BACKEND
+        engine_label = next((lbl for lbl, name in engines.items() if name == saved_engine), STT_BACKENDS[STT_DEFAULT_BACKEND].label)
+        engine_var = tk.StringVar(value=engine_label)
+        ttk.Combobox(win, textvariable=engine_var, values=list(engines), state='readonly', width=24).pack()
+        # Single file or whole folder
+        mode_var = tk.StringVar(value="single")
+        modes = ttk.Frame(win); modes.pack(pady=(8, 0))
+        ttk.Radiobutton(modes, text="Single file", variable=mode_var, value="single").pack(side=tk.LEFT, padx=6)
+        ttk.Radiobutton(modes, text="Whole folder (batch)", variable=mode_var, value="batch").pack(side=tk.LEFT, padx=6)
+        # Output format: plain text, subtitles with timestamps, or JSON Lines
+        ttk.Label(win, text="Output format").pack(pady=(8, 2))
+        saved_fmt = get_setting("stt_output_format") or ".txt"
+        fmt_var = tk.StringVar(value=saved_fmt if saved_fmt in TRANSCRIPT_EXTENSIONS else ".txt")
+        ttk.Combobox(win, textvariable=fmt_var, values=TRANSCRIPT_EXTENSIONS, state='readonly', width=24).pack()
         # Buttons
         btns = ttk.Frame(win); btns.pack(pady=10)
         sel = {"val": None}
         def ok():
-            sel["val"] = var.get()
+            sel["val"] = (var.get(), mode_var.get() == "batch", fmt_var.get())
             try:
-                set_setting("stt_lang", sel["val"])
+                set_setting("stt_lang", sel["val"][0])
+                set_setting("stt_output_format", sel["val"][2])
+                set_setting("stt_backend", engines.get(engine_var.get(), STT_DEFAULT_BACKEND))
             except Exception:
                 pass
             win.destroy()
@@ -497,8 +538,12 @@ def audio_to_text_action():
         win.wait_window()
         return sel["val"]
 
-    lang = ask_language(root)
-    if not lang:
+    choice = ask_language(root)
+    if not choice:
+        return
+    lang, batch, out_ext = choice
+    if batch:
+        batch_audio_to_text(lang, out_ext)
         return
 
     # Build a filter string from SUPPORTED_EXTENSIONS to keep GUI and backend in sync
@@ -512,13 +557,19 @@ def audio_to_text_action():
         # User cancelled; do nothing.
         return
     base_name = os.path.splitext(os.path.basename(audio_file))[0]
-    default_text_name = f"{base_name}.txt"
+    default_text_name = f"{base_name}{out_ext}"
     if audio_file:
         set_setting("last_dir_audio", os.path.dirname(audio_file))
-    text_file = filedialog.asksaveasfilename(title="Save transcription as", defaultextension=".txt", initialfile=default_text_name, initialdir=(get_setting("last_dir_audio") or ""), filetypes=[("Text File", "*.txt")])
+    format_names = {".txt": "Text File", ".srt": "SubRip Subtitles", ".vtt": "WebVTT Subtitles", ".jsonl": "JSON Lines"}
+    filetypes = [(format_names[out_ext], f"*{out_ext}")] + [(format_names[e], f"*{e}") for e in TRANSCRIPT_EXTENSIONS if e != out_ext]
+    text_file = filedialog.asksaveasfilename(title="Save transcription as", defaultextension=out_ext, initialfile=default_text_name, initialdir=(get_setting("last_dir_audio") or ""), filetypes=filetypes)
     if not text_file:
         # User cancelled; do nothing.
         return
+    if needs_ffmpeg(audio_file):
+        from src.utils.ffmpeg_finder import resolve_ffmpeg
+        # Find ffmpeg (and offer the download) here on the Tk thread; transcription runs in a worker
+        resolve_ffmpeg()
     try:
         # Use determinate progress driven by chunked transcription
         success, msg = run_with_progress(
@@ -537,6 +588,90 @@ def audio_to_text_action():
         messagebox.showerror("Error", f"Unexpected error: {e}")
 
 
+def batch_audio_to_text(lang: str, out_ext: str = ".txt"):
+    """Transcribe every supported audio file in a folder into one transcript (out_ext) per input."""
+    import threading
+    import time
+    from src.models.audio_to_text import convert_audio_batch, list_audio_files
+    from src.utils.ffmpeg_finder import resolve_ffmpeg
+    from src.utils.output_paths import reserve_output_path
+    input_dir = filedialog.askdirectory(title="Select the folder with audio files", initialdir=(get_setting("last_dir_audio") or ""))
+    if not input_dir:
+        # User cancelled; do nothing.
+        return
+    set_setting("last_dir_audio", input_dir)
+    output_dir = filedialog.askdirectory(title="Select the directory to save transcriptions", initialdir=(get_setting("last_dir_audio_out") or input_dir))
+    if not output_dir:
+        # User cancelled; do nothing.
+        return
+    set_setting("last_dir_audio_out", output_dir)
+    audio_files = list_audio_files(input_dir)
+    if not audio_files:
+        messagebox.showwarning("Warning", "No supported audio files found in the folder.")
+        return
+    jobs = []
+    taken: set[str] = set()  # a.mp3 and a.wav must not share (and both stream into) a.txt
+    for audio_file in audio_files:
+        base_name = os.path.splitext(os.path.basename(audio_file))[0]
+        jobs.append((audio_file, reserve_output_path(os.path.join(output_dir, f"{base_name}{out_ext}"), taken, audio_file)))
+    if any(needs_ffmpeg(f) for f in audio_files):
+        resolve_ffmpeg()  # on the Tk thread, before the batch worker starts
+
+    def _do_batch(report, set_status):
+        results = {}
+        lock = threading.Lock()
+        in_flight: dict[str, float] = {}  # input -> fraction done
+        finished = {'n': 0}
+        started = time.monotonic()
+
+        def publish():
+            with lock:
+                fraction = (finished['n'] + sum(in_flight.values())) / len(jobs)
+                done = finished['n']
+            status = f"{done}/{len(jobs)} done"
+            elapsed = time.monotonic() - started
+            if 0.02 < fraction < 1.0 and elapsed > 5:
+                m, sec = divmod(int(elapsed * (1.0 - fraction) / fraction), 60)
+                h, m = divmod(m, 60)
+                status += f" · ETA {h}:{m:02d}:{sec:02d}" if h else f" · ETA {m}:{sec:02d}"
+            report(fraction * 100.0)
+            set_status(status)
+
+        def on_progress(audio_file, pct):
+            with lock:
+                in_flight[audio_file] = min(1.0, float(pct) / 100.0)
+            publish()
+
+        for audio_file, text_file, ok, msg in convert_audio_batch(jobs, lang, on_progress=on_progress):
+            try:
+                if ok:
+                    _conversion_service.log_success("audio_to_text_batch", audio_file, text_file, username=current_user)
+                    results[audio_file] = f"{os.path.basename(audio_file)}: Success"
+                else:
+                    _conversion_service.log_error("audio_to_text_batch", audio_file, msg, username=current_user)
+                    results[audio_file] = f"{os.path.basename(audio_file)}: Error - {msg.splitlines()[0] if msg else ''}"
+            except Exception:
+                results[audio_file] = f"{os.path.basename(audio_file)}: Exception"
+            finally:
+                with lock:
+                    in_flight.pop(audio_file, None)
+                    finished['n'] += 1
+                publish()
+        # Summary keeps folder order regardless of completion order
+        ok_count = sum(1 for v in results.values() if v.endswith(": Success"))
+        lines = [results[a] for a in audio_files if a in results]
+        failed = [line for line in lines if not line.endswith(": Success")]
+        summary = f"Transcribed {ok_count}/{len(jobs)} file(s) into {output_dir}."
+        if failed:
+            summary += "\n\n" + "\n".join(failed[:15])
+            if len(failed) > 15:
+                summary += f"\n… and {len(failed) - 15} more (see the conversion log)."
+        return summary
+
+    summary = run_with_progress_status("Batch audio transcription", _do_batch, auto=False)
+    messagebox.showinfo("Transcription Completed", summary)
+
+
 def qr_code_action():
     """Generate QR code from text or URL."""
     text = simpledialog.askstring("Input Text", "Enter text or URL to generate a QR Code:")
@@ -573,8 +708,8 @@ def qr_code_action():
         messagebox.showerror("Error", f"Unexpected error: {e}")
 
 
-def batch_video_conversion(output_format):
-    """Batch convert videos in a folder."""
+def batch_video_conversion(output_format, workers: int | None = None):
+    """Batch convert videos in a folder, running up to `workers` conversions at once."""
     input_dir = filedialog.askdirectory(title="Select the folder with videos to convert", initialdir=(get_setting("last_dir_video") or ""))
     if not input_dir:
         # User cancelled; do nothing.
@@ -592,29 +727,57 @@ def batch_video_conversion(output_format):
     if not videos:
         messagebox.showwarning("Warning", "No videos found in the folder.")
         return
-    # Run batch with step-based progress
-    from src.models.convert_video import convert_video_file
-    def _do_batch(step):
-        results = []
-        for video_file in videos:
-            base_name = os.path.splitext(os.path.basename(video_file))[0]
-            output_file = os.path.join(output_dir, f"{base_name}_converted.{output_format}")
+    # Run batch with per-file ffmpeg progress; conversions run concurrently
+    import threading
+    from src.models.convert_video import convert_video_batch, format_progress_status
+    from src.utils.ffmpeg_finder import resolve_ffmpeg
+    from src.utils.output_paths import reserve_output_path
+    jobs = []
+    taken: set[str] = set()
+    for video_file in videos:
+        base_name = os.path.splitext(os.path.basename(video_file))[0]
+        output_file = reserve_output_path(os.path.join(output_dir, f"{base_name}_converted.{output_format}"), taken, video_file)
+        jobs.append((video_file, output_file, output_format))
+    # Find ffmpeg (and offer the download) here on the Tk thread; the batch runs in a worker
+    resolve_ffmpeg()
+
+    def _do_batch(report, set_status):
+        results = {}
+        lock = threading.Lock()
+        in_flight: dict[str, float] = {}  # input -> fraction done
+        finished = {'n': 0}
+
+        def publish(status: str):
+            with lock:
+                pct = (finished['n'] + sum(in_flight.values())) / len(jobs) * 100.0
+            report(pct)
+            set_status(status)
+
+        def on_progress(video_file, event):
+            with lock:
+                in_flight[video_file] = event.percent / 100.0
+            detail = format_progress_status(event)
+            publish(f"{finished['n']}/{len(jobs)} done · {os.path.basename(video_file)} {detail}".strip())
+
+        for video_file, output_file, ok, msg in convert_video_batch(jobs, workers=workers, on_progress=on_progress):
             try:
-                ok, msg = convert_video_file(video_file, output_file, output_format)
                 if ok:
                     _conversion_service.log_success("video_batch", video_file, output_file, username=current_user)
-                    results.append(f"{os.path.basename(video_file)}: Success")
+                    results[video_file] = f"{os.path.basename(video_file)}: Success"
                 else:
                     _conversion_service.log_error("video_batch", video_file, msg, username=current_user)
-                    results.append(f"{os.path.basename(video_file)}: Error")
-            except Exception as e:
-                _conversion_service.log_error("video_batch", video_file, str(e), username=current_user)
-                results.append(f"{os.path.basename(video_file)}: Exception")
+                    results[video_file] = f"{os.path.basename(video_file)}: Error"
+            except Exception:
+                results[video_file] = f"{os.path.basename(video_file)}: Exception"
             finally:
-                step(1)
-        return "\n".join(results)
-
-    summary = run_steps("Batch video conversion", len(videos), _do_batch)
+                with lock:
+                    in_flight.pop(video_file, None)
+                    finished['n'] += 1
+                publish(f"{finished['n']}/{len(jobs)} done")
+        # Summary keeps folder order regardless of completion order
+        return "\n".join(results[v] for v in videos if v in results)
+
+    summary = run_with_progress_status("Batch video conversion", _do_batch, auto=False)
     messagebox.showinfo("Conversion Completed", summary)
 
 
@@ -627,7 +790,7 @@ def video_conversion_action():
     # Create a new window for the video conversion options
     conv_win = tk.Toplevel(root)
     conv_win.title("Select Video Conversion Type")
-    conv_win.geometry("300x300")
+    conv_win.geometry("300x360")
     conv_win.resizable(False, False)
     conv_win.grab_set()  # Make the window modal
 
@@ -653,6 +816,18 @@ def video_conversion_action():
     rb_mov = ttk.Radiobutton(conv_win, text="MOV", variable=format_var, value="mov")
     rb_mov.pack(anchor="w", padx=40)
 
+    # Number of videos converted at the same time in batch mode
+    from src.models.convert_video import default_batch_workers
+    try:
+        saved_workers = int(get_setting("video_batch_workers") or 0)
+    except Exception:
+        saved_workers = 0
+    workers_var = tk.IntVar(value=saved_workers if saved_workers > 0 else default_batch_workers())
+    workers_row = ttk.Frame(conv_win)
+    workers_row.pack(pady=(10, 0))
+    ttk.Label(workers_row, text="Parallel conversions (batch):").pack(side=tk.LEFT)
+    ttk.Spinbox(workers_row, from_=1, to=max(1, os.cpu_count() or 1), textvariable=workers_var, width=4).pack(side=tk.LEFT, padx=6)
+
     def confirm():
         # Destroy the conversion window and proceed with the selected conversion type
         conv_win.destroy()
@@ -660,7 +835,12 @@ def video_conversion_action():
             # Pass the selected format to convert_video_choice
             convert_video_choice(root, format_var.get())
         else:
-            batch_video_conversion(format_var.get())
+            try:
+                workers = max(1, int(workers_var.get()))
+                set_setting("video_batch_workers", str(workers))
+            except Exception:
+                workers = None
+            batch_video_conversion(format_var.get(), workers)
 
     btn_confirm = ttk.Button(conv_win, text="Confirm", command=confirm)
     btn_confirm.pack(pady=10)
@@ -859,7 +1039,7 @@ def build_app_ui(username: str, role: str, raw_password: str, user_id: int):
 
     def wrap_remove_bg():
         try:
-            remove_background()
+            remove_background(username=current_user)
             _conversion_service.log_success("remove_background", None, None, username=current_user)
         except Exception as e:
             _conversion_service.log_error("remove_background", None, str(e), username=current_user)
@@ -1045,6 +1225,9 @@ def build_app_ui(username: str, role: str, raw_password: str, user_id: int):
 
     root.protocol("WM_DELETE_WINDOW", on_close)
 
+    # Load the background-removal model in the background (no-op without rembg)
+    root.after(1500, warm_up_session)
+
     # ------------------------------------------------------------
     # Options dialog (admin/user)
     # ------------------------------------------------------------
@@ -1,10 +1,18 @@
 import os
-import tempfile
-from typing import List
 import speech_recognition as sr
-from pydub import AudioSegment
-from src.utils.ffmpeg_finder import ensure_ffmpeg
+from src.utils.ffmpeg_finder import resolve_ffmpeg, no_window_popen_kwargs
+from src.models.stt_backends import RecognizerBackend, BackendUnavailable, get_backend
+from src.utils.transcript_checkpoint import TranscriptCheckpoint, transcript_job_key
+from src.utils.transcript_cache import TranscriptCache, segment_key
+from src.utils.pcm import frame_rms, normalize_gain, wav_info, iter_wav_chunks
+from src.utils.transcript_writers import writer_for_path
 import subprocess
+import threading
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from collections import deque
+from dataclasses import dataclass
 import platform
 
 # On Windows, suppress flashing console windows spawned by pydub/ffmpeg by
@@ -47,165 +55,522 @@ SUPPORTED_EXTENSIONS: list[str] = [
     '.mp4', '.webm', '.avi', '.mov', '.3gp', '.opus'
 ]
 
+# Recognizer input format: 16 kHz, mono, 16-bit little-endian PCM
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+_BYTES_PER_MS = SAMPLE_RATE * SAMPLE_WIDTH // 1000
+
+# Concurrent recognition: chunks in flight and retry policy for transient API errors
+RECOGNIZE_WORKERS = 4
+RECOGNIZE_RETRIES = 3
+RECOGNIZE_BACKOFF_S = 1.0
+
+# Batch mode: files transcribed at once. While one file waits on the recognizer,
+# the next one is already being decoded by its own ffmpeg process.
+AUDIO_BATCH_WORKERS = 2
+
+# Fixed-length chunking (used when silence detection is off)
+FIXED_CHUNK_MS = 10000
+
+# Silence-aware segmentation: 30 ms analysis frames; segments are cut at a pause
+# once they reach VAD_MIN_SEGMENT_MS and never exceed VAD_MAX_SEGMENT_MS
+VAD_FRAME_MS = 30
+VAD_MIN_SEGMENT_MS = 3000
+VAD_MAX_SEGMENT_MS = 10000
+VAD_PAUSE_MS = 300          # silence needed to end a segment
+VAD_PAD_MS = 150            # silence kept around speech so word edges aren't clipped
+VAD_MIN_SPEECH_MS = 120     # segments with less voiced audio than this are dropped
+VAD_SILENCE_RMS = 200       # absolute floor (~ -44 dBFS); quieter frames are always silence
+VAD_NOISE_RATIO = 3.0       # frames this much louder than the tracked noise floor are speech
+
 def _resolve_ffmpeg_exe() -> str | None:  # backwards-compat wrapper
-    ffmpeg, _ = ensure_ffmpeg(allow_download=True)
-    return str(ffmpeg) if ffmpeg else None
+    return resolve_ffmpeg()[0]
+
+
+def needs_ffmpeg(audio_file: str) -> bool:
+    """False for plain PCM WAV files, which are decoded in-process."""
+    return not (os.path.splitext(audio_file)[1].lower() == '.wav' and wav_info(audio_file) is not None)
+
+
+def probe_duration(ffprobe: str | None, src_path: str) -> float | None:
+    """Duration in seconds via ffprobe, or None if unavailable."""
+    if not ffprobe:
+        return None
+    try:
+        out = subprocess.run(
+            [ffprobe, '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=nw=1:nk=1', src_path],
+            capture_output=True, text=True, timeout=60, **no_window_popen_kwargs(),
+        )
+        value = float(out.stdout.strip())
+        return value if value > 0 else None
+    except Exception:
+        return None
+
+
+def _normalize_chunk(chunk: bytes) -> bytes:
+    """Bring one PCM chunk to ~ -20 dBFS; near-silent chunks are left alone."""
+    return normalize_gain(chunk, -20.0, -60.0)
 
-def convert_audio_to_text(audio_file, text_file, language: str = 'pt-BR', progress=None):
+
+def iter_pcm_chunks(ffmpeg: str, src_path: str, chunk_ms: int, max_buffered: int = 8):
+    """Decode src_path with ffmpeg into 16 kHz mono s16le and yield fixed-size chunks.
+
+    A reader thread keeps decoding ahead into a bounded queue (max_buffered
+    chunks), so recognition of one chunk overlaps decoding of the next while
+    memory stays constant in recording length. Raises RuntimeError if ffmpeg
+    fails; closing the generator early stops ffmpeg.
+    """
+    chunk_bytes = chunk_ms * _BYTES_PER_MS
+    cmd = [
+        ffmpeg, '-nostdin', '-v', 'error', '-i', src_path,
+        '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1',
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **no_window_popen_kwargs())
+    buf: queue.Queue = queue.Queue(maxsize=max(1, max_buffered))
+    err_tail: list[bytes] = []
+    stop = threading.Event()
+
+    def _reader():
+        try:
+            while not stop.is_set():
+                data = proc.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                buf.put(data)
+        finally:
+            buf.put(None)
+
+    threading.Thread(target=lambda: err_tail.extend(proc.stderr), daemon=True).start()
+    threading.Thread(target=_reader, daemon=True).start()
+    try:
+        while True:
+            data = buf.get()
+            if data is None:
+                break
+            yield data
+        if proc.wait() != 0:
+            detail = b"".join(err_tail[-5:]).decode('utf-8', 'replace').strip()
+            raise RuntimeError(f"FFmpeg could not decode the audio. {detail}".strip())
+    finally:
+        stop.set()
+        if proc.poll() is None:
+            proc.kill()
+        # Unblock the reader if it is waiting on a full queue
+        try:
+            while True:
+                buf.get_nowait()
+        except queue.Empty:
+            pass
+
+
+@dataclass
+class SpeechSegment:
+    """A span of 16 kHz mono s16le audio with its position in the source (milliseconds)."""
+    start_ms: int
+    end_ms: int
+    pcm: bytes
+
+
+def iter_fixed_segments(chunks, chunk_ms: int = FIXED_CHUNK_MS):
+    """Wrap fixed-size PCM chunks (see iter_pcm_chunks) as SpeechSegments."""
+    pos = 0
+    for chunk in chunks:
+        length = len(chunk) // _BYTES_PER_MS
+        yield SpeechSegment(pos, pos + length, chunk)
+        pos += length
+
+
+def iter_speech_segments(chunks, min_ms: int = VAD_MIN_SEGMENT_MS, max_ms: int = VAD_MAX_SEGMENT_MS,
+                         pause_ms: int = VAD_PAUSE_MS, pad_ms: int = VAD_PAD_MS):
+    """Energy-based segmentation of a 16 kHz mono s16le stream.
+
+    chunks is any iterable of PCM byte strings (e.g. iter_pcm_chunks). Frames
+    are classified as speech when their RMS clears both VAD_SILENCE_RMS and
+    VAD_NOISE_RATIO times an adaptive noise floor. A segment starts at the first speech frame, ends at
+    the first pause of pause_ms once it is at least min_ms long, and is cut at
+    its quietest frame if it reaches max_ms without a pause. Silent spans
+    between segments are never yielded.
+    """
+    frame_bytes = VAD_FRAME_MS * _BYTES_PER_MS
+    pad_frames = max(0, pad_ms // VAD_FRAME_MS)
+    pause_frames = max(1, pause_ms // VAD_FRAME_MS)
+    min_frames = max(1, min_ms // VAD_FRAME_MS)
+    max_frames = max(min_frames + 1, max_ms // VAD_FRAME_MS)
+    min_voiced = max(1, VAD_MIN_SPEECH_MS // VAD_FRAME_MS)
+
+    noise_floor = VAD_SILENCE_RMS / VAD_NOISE_RATIO
+    lead: deque = deque(maxlen=pad_frames)  # recent silent frames before a segment starts
+    frames: list[bytes] = []                # current segment
+    levels: list[int] = []
+    voiced = 0
+    silence_run = 0
+    seg_start = 0
+    index = 0                               # frame index in the stream
+    leftover = b""
+
+    def _emit(count: int):
+        data = b"".join(frames[:count])
+        start = seg_start * VAD_FRAME_MS
+        return SpeechSegment(start, start + count * VAD_FRAME_MS, data)
+
+    for chunk in chunks:
+        buf = leftover + chunk
+        usable = len(buf) - len(buf) % frame_bytes
+        leftover = buf[usable:]
+        # Energies of every frame in the chunk in one vectorized pass
+        for off, rms in zip(range(0, usable, frame_bytes), frame_rms(buf[:usable], frame_bytes)):
+            frame = buf[off:off + frame_bytes]
+            is_speech = rms >= max(VAD_SILENCE_RMS, noise_floor * VAD_NOISE_RATIO)
+            if rms < noise_floor:
+                noise_floor = rms
+            else:
+                # Follow the background quickly during pauses; creep during speech so a
+                # steady loud background is eventually treated as noise
+                noise_floor += (rms - noise_floor) * (0.0005 if is_speech else 0.05)
+
+            if not frames:
+                if is_speech:
+                    frames.extend(lead)
+                    levels.extend([0] * len(lead))
+                    seg_start = index - len(lead)
+                    lead.clear()
+                    frames.append(frame)
+                    levels.append(rms)
+                    voiced, silence_run = 1, 0
+                else:
+                    lead.append(frame)
+                index += 1
+                continue
+
+            frames.append(frame)
+            levels.append(rms)
+            if is_speech:
+                voiced += 1
+                silence_run = 0
+            else:
+                silence_run += 1
+            index += 1
+
+            if silence_run >= pause_frames and len(frames) >= min_frames:
+                keep = len(frames) - silence_run + min(pad_frames, silence_run)
+                if voiced >= min_voiced:
+                    yield _emit(keep)
+                lead.extend(frames[keep:])
+                frames.clear(); levels.clear()
+                voiced = silence_run = 0
+            elif len(frames) >= max_frames:
+                # No pause in time: cut at the quietest frame past min_ms and carry the rest over
+                cut = min(range(min_frames, len(frames)), key=lambda k: levels[k])
+                if voiced >= min_voiced:
+                    yield _emit(cut)
+                frames[:] = frames[cut:]
+                levels[:] = levels[cut:]
+                seg_start += cut
+                voiced = sum(1 for lv in levels if lv >= max(VAD_SILENCE_RMS, noise_floor * VAD_NOISE_RATIO))
+                silence_run = 0
+
+    if frames and voiced >= min_voiced:
+        keep = len(frames) - silence_run + min(pad_frames, silence_run)
+        yield _emit(min(keep, len(frames)))
+
+
+def _recognize_with_retry(backend: RecognizerBackend, chunk: bytes, language: str) -> tuple[bool, str, float | None]:
+    """Recognize one PCM chunk, retrying RequestError with exponential backoff.
+
+    Returns (ok, text, confidence); on failure text holds the error message.
+    """
+    retries, backoff = RECOGNIZE_RETRIES, RECOGNIZE_BACKOFF_S
+    attempt = 0
+    while True:
+        try:
+            text, confidence = backend.recognize(chunk, language)
+            return True, text or "", confidence
+        except sr.UnknownValueError:
+            return True, "", None  # treat as empty segment rather than failing the whole job
+        except sr.RequestError as e:
+            if attempt >= retries:
+                return False, f"Request error: {e}", None
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
+        except BackendUnavailable as e:
+            return False, str(e), None
+        except Exception as e:
+            return False, f"Unexpected error during segment transcription: {e}", None
+
+
+_cache: TranscriptCache | None = None
+_cache_lock = threading.Lock()
+
+
+def _transcript_cache() -> TranscriptCache:
+    """Process-wide handle on the persistent segment cache (opened on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranscriptCache()
+        return _cache
+
+
+def _segmentation_signature(vad: bool) -> tuple:
+    """Settings that determine segment boundaries (part of the checkpoint key)."""
+    if not vad:
+        return ('fixed', FIXED_CHUNK_MS)
+    return ('vad', VAD_FRAME_MS, VAD_MIN_SEGMENT_MS, VAD_MAX_SEGMENT_MS, VAD_PAUSE_MS,
+            VAD_PAD_MS, VAD_MIN_SPEECH_MS, VAD_SILENCE_RMS, VAD_NOISE_RATIO)
+
+
+def _with_resume_hint(message: str, checkpoint: TranscriptCheckpoint) -> str:
+    if checkpoint.path is None or not len(checkpoint):
+        return message
+    return f"{message}\nProgress was saved ({len(checkpoint)} segment(s)); run the same transcription again to resume."
+
+
+def convert_audio_to_text(audio_file, text_file, language: str = 'pt-BR', progress=None,
+                          workers: int = RECOGNIZE_WORKERS, backend=None, vad: bool = True,
+                          resume: bool = True, use_cache: bool = True, ffmpeg_paths: tuple[str, str] | None = None):
     """
     Converts an audio file to text using speech recognition.
-    If the audio is not in WAV format, it is first converted using pydub.
+    FFmpeg decodes the audio into 16 kHz mono PCM as a stream, which is cut into
+    segments at pauses (silent spans are skipped). Segments are loudness-normalized
+    and sent to the recognizer from a small thread pool while decoding continues;
+    text is reassembled in segment order.
     
     Parameters:
       - audio_file: Path to the input audio.
-      - text_file: Path where the transcription will be saved.
+      - text_file: Path where the transcription will be saved; the extension picks
+        the format (.txt, .srt, .vtt or .jsonl with per-segment timestamps).
+      - workers: Chunks recognized concurrently (1 = sequential).
+      - vad: Cut at pauses and drop silence; False restores fixed 10 s chunks.
+      - backend: Recognizer backend name or instance (see stt_backends); defaults
+        to the ``stt_backend`` setting.
+      - resume: Checkpoint finished segments so a failed run can be resumed; the
+        text file is only written once every segment is done.
+      - use_cache: Look up segments already recognized in any earlier run (same
+        audio, language and engine) in the persistent transcript cache.
+      - ffmpeg_paths: (ffmpeg, ffprobe) already resolved by the caller; otherwise
+        resolve_ffmpeg() is used, which only offers the download on the Tk thread.
       
     Returns:
       A tuple (True, success message) if successful, or (False, error message).
     """
-    recognizer = sr.Recognizer()
     if not audio_file or not text_file:
         return False, "Missing input audio or output text path."
+    if not isinstance(backend, RecognizerBackend):
+        backend = get_backend(backend)
+    workers = max(1, int(workers or 1))
 
-    # Configure ffmpeg/ffprobe path robustly (single prompt for both)
-    ffmpeg_p, ffprobe_p = ensure_ffmpeg(allow_download=True)
-    ffmpeg_path = str(ffmpeg_p) if ffmpeg_p else None
-    ffprobe_path = str(ffprobe_p) if ffprobe_p else None
-    if ffmpeg_path:
-        # pydub primarily uses 'converter'; some versions also read 'ffmpeg'
-        AudioSegment.converter = ffmpeg_path
-        try:
-            AudioSegment.ffmpeg = ffmpeg_path  # type: ignore[attr-defined]
-        except Exception:
-            pass
-    # Try to point pydub to ffprobe as well if available
-    if ffprobe_path:
-        try:
-            AudioSegment.ffprobe = ffprobe_path  # type: ignore[attr-defined]
-        except Exception:
-            pass
-    # If not found, let pydub try "ffmpeg" from PATH. We'll fail gracefully below if missing.
-
-    # Supported audio formats by pydub (exported so GUI can match)
+    # Supported audio formats (exported so GUI can match)
     audio_extension = os.path.splitext(audio_file)[1].lower()
     if audio_extension not in SUPPORTED_EXTENSIONS:
         return False, f"Audio format not supported: {audio_extension}"
 
-    # Helper: normalize and convert to 16kHz mono 16-bit PCM WAV
-    def _to_wav_16k_mono(src_path: str) -> str | None:
-        try:
-            seg = AudioSegment.from_file(src_path)
-            # Normalize loudness to ~ -20 dBFS
-            try:
-                change = -20.0 - (seg.dBFS if seg.dBFS != float('-inf') else -30.0)
-                seg = seg.apply_gain(change)
-            except Exception:
-                pass
-            seg = seg.set_frame_rate(16000).set_channels(1).set_sample_width(2)
-            tmp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-            tmp_wav_path = tmp_wav.name
-            tmp_wav.close()
-            seg.export(tmp_wav_path, format='wav')
-            return tmp_wav_path
-        except FileNotFoundError as e:
-            return None
-        except Exception:
-            return None
+    # Plain PCM WAV is decoded, downmixed and resampled in-process; everything else goes through ffmpeg
+    wav = wav_info(audio_file) if audio_extension == '.wav' else None
+    ffmpeg_path = ffprobe_path = None
+    if wav is None:
+        # Bare names when ffmpeg wasn't found: fall back to PATH; fails gracefully below
+        ffmpeg_path, ffprobe_path = ffmpeg_paths or resolve_ffmpeg()
 
-    # Build a WAV we can feed reliably to SpeechRecognition
-    wav_path = None
+    # Load the engine (e.g. an offline model) before decoding starts
     try:
-        if audio_extension == '.wav':
-            # Still ensure correct rate/channels/bit depth
-            wav_path = _to_wav_16k_mono(audio_file)
-        else:
-            wav_path = _to_wav_16k_mono(audio_file)
-        if not wav_path:
-            return False, "Failed to prepare audio for transcription (conversion to WAV failed)."
-    except Exception as e:
-        return False, f"Failed to convert audio to WAV: {e}"
+        backend.prepare(language)
+    except BackendUnavailable as e:
+        return False, str(e)
 
-    # Helper: transcribe a wav segment path
-    def _transcribe_wav_segment(wav_seg_path: str) -> tuple[bool, str]:
-        try:
-            with sr.AudioFile(wav_seg_path) as source:
-                audio_data = recognizer.record(source)
-                # Use chosen language (BCP-47), e.g., 'pt-BR', 'en-US'
-                text = recognizer.recognize_google(audio_data, language=language)
-                return True, text
-        except sr.UnknownValueError:
-            return True, ""  # treat as empty segment rather than failing the whole job
-        except sr.RequestError as e:
-            return False, f"Request error: {e}"
-        except Exception as e:
-            return False, f"Unexpected error during segment transcription: {e}"
+    # Finished segments of an earlier, interrupted run of the same job are reused
+    checkpoint = TranscriptCheckpoint(
+        transcript_job_key(audio_file, language, backend.name, _segmentation_signature(vad),
+                           'wav' if wav else 'ffmpeg') if resume else None
+    )
 
-    # If the audio is long, split into ~10s chunks to avoid API Bad Request and improve progress smoothness
+    # Segments are streamed to <text_file>.part in order as they finish (so a long job can be
+    # watched and a crash keeps the partial output); the finished file is renamed into place
+    part_file = f"{text_file}.part"
     try:
-        full = AudioSegment.from_wav(wav_path)
-        max_ms = 10000  # 10 seconds per chunk
-        chunks: List[AudioSegment] = []
-        if len(full) <= max_ms:
-            chunks = [full]
-        else:
-            for start in range(0, len(full), max_ms):
-                end = min(len(full), start + max_ms)
-                chunks.append(full[start:end])
+        out_fp = open(part_file, 'w', encoding='utf-8')
+    except OSError as e:
+        checkpoint.close()
+        return False, f"Cannot write the transcription to '{text_file}': {e}"
+    writer = writer_for_path(text_file, out_fp)
 
-        collected: list[str] = []
-        tmp_paths: list[str] = []
-        try:
-            total = max(1, len(chunks))
-            # Initial progress
-            if progress:
-                try: progress(0)
-                except Exception: pass
-            for i, seg in enumerate(chunks):
-                tmp = tempfile.NamedTemporaryFile(delete=False, suffix=f".part{i}.wav")
-                tmp_paths.append(tmp.name)
-                tmp.close()
-                seg.export(tmp.name, format='wav')
-                ok, piece = _transcribe_wav_segment(tmp.name)
+    # Cut at pauses (or every 10 s with vad=False) to keep requests short and progress smooth
+    try:
+        duration = wav[3] / float(wav[0]) if wav else probe_duration(ffprobe_path, audio_file)
+        duration_ms = duration * 1000 if duration else None
+
+        ready: dict[int, tuple] = {}  # finished segments waiting for an earlier one
+        next_index = 0
+        submitted = 0
+        done = 0
+        decoded_ms = 0
+        sent_ms = 0
+        reused = 0
+        cache_hits = 0
+        cache = _transcript_cache() if use_cache else None
+        last_pct = 0.0
+
+        def _report():
+            nonlocal last_pct
+            if not progress:
+                return
+            try:
+                if duration_ms:
+                    # Decoded share of the file, scaled by how much of it has been recognized
+                    pct = min(99.0, (decoded_ms / duration_ms) * (done / max(1, submitted)) * 100.0)
+                else:
+                    # Without a duration the total is unknown; progress eases towards 95%
+                    pct = 95.0 * (1.0 - 1.0 / (1.0 + done / 20.0))
+                last_pct = max(last_pct, pct)
+                progress(last_pct)
+            except Exception:
+                pass
+
+        def _store(i, start_ms, end_ms, text, confidence):
+            nonlocal next_index, done
+            done += 1
+            ready[i] = (start_ms, end_ms, text, confidence)
+            while next_index in ready:
+                writer.write(next_index, *ready.pop(next_index))
+                next_index += 1
+
+        def _collect(futs) -> str | None:
+            for fut in futs:
+                ok, piece, confidence = fut.result()
                 if not ok:
-                    # If one chunk fails with Bad Request, report with context
-                    return False, piece
-                if piece:
-                    collected.append(piece)
-                # Report chunk-based progress
-                if progress:
-                    try:
-                        pct = min(99.0, ((i + 1) / total) * 100.0)
-                        progress(pct)
-                    except Exception:
-                        pass
-        finally:
-            # cleanup temp chunk files
-            for p in tmp_paths:
-                try:
-                    os.remove(p)
-                except Exception:
-                    pass
+                    return piece
+                i, start_ms, end_ms, key = pending.pop(fut)
+                checkpoint.add(i, start_ms, end_ms, piece, confidence)
+                if key:
+                    cache.put(key, piece, confidence)
+                _store(i, start_ms, end_ms, piece, confidence)
+            _report()
+            return None
 
-        final_text = "\n".join(collected).strip()
-        with open(text_file, 'w', encoding='utf-8') as f:
-            f.write(final_text)
+        # Initial progress
+        if progress:
+            try: progress(0)
+            except Exception: pass
+        chunk_ms = 1000 if vad else FIXED_CHUNK_MS
+        if wav:
+            chunks = iter_wav_chunks(audio_file, chunk_ms)
+        else:
+            chunks = iter_pcm_chunks(ffmpeg_path, audio_file, chunk_ms)
+        segments = iter_speech_segments(chunks) if vad else iter_fixed_segments(chunks)
+        # At most 2 chunks per worker in flight keeps memory bounded while the pool stays busy
+        max_in_flight = workers * 2
+        pending: dict = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                for i, seg in enumerate(segments):
+                    submitted += 1
+                    decoded_ms = seg.end_ms
+                    cached = checkpoint.get(i, seg.start_ms, seg.end_ms)
+                    if cached is not None:
+                        _store(i, seg.start_ms, seg.end_ms, *cached)
+                        reused += 1
+                        _report()
+                        continue
+                    pcm = _normalize_chunk(seg.pcm)
+                    key = segment_key(pcm, language, backend.name) if cache else None
+                    hit = cache.get(key) if key else None
+                    if hit is not None:
+                        checkpoint.add(i, seg.start_ms, seg.end_ms, hit[0], hit[1])
+                        _store(i, seg.start_ms, seg.end_ms, *hit)
+                        cache_hits += 1
+                        _report()
+                        continue
+                    fut = pool.submit(_recognize_with_retry, backend, pcm, language)
+                    pending[fut] = (i, seg.start_ms, seg.end_ms, key)
+                    sent_ms += seg.end_ms - seg.start_ms
+                    if len(pending) < max_in_flight:
+                        continue
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    error = _collect(finished)
+                    if error:
+                        return False, _with_resume_hint(error, checkpoint)
+                decoded_ms = duration_ms or decoded_ms
+                for fut in as_completed(list(pending)):
+                    error = _collect([fut])
+                    if error:
+                        return False, _with_resume_hint(error, checkpoint)
+            finally:
+                chunks.close()
+                for fut in pending:
+                    fut.cancel()
+
+        out_fp.close()
+        os.replace(part_file, text_file)
+        checkpoint.discard()
+        if cache:
+            cache.trim()
         # Snap to 100% at the very end
         if progress:
             try: progress(100)
             except Exception: pass
-        return True, f"Transcription saved successfully at '{text_file}'!"
+        return True, (
+            f"Transcription saved successfully at '{text_file}'!\n"
+            f"{submitted} segment(s), {sent_ms / 1000:.0f}s of audio sent for recognition."
+            + (f"\nResumed: {reused} segment(s) reused from the previous run." if reused else "")
+            + (f"\n{cache_hits} segment(s) reused from the transcript cache." if cache_hits else "")
+        )
     except FileNotFoundError as e:
-        # This can also surface if ffmpeg was needed and not found
+        # Raised when the ffmpeg executable itself is missing
         return False, (
             "Failed to open audio file. Check if the file exists and if FFmpeg is available.\n"
             f"Details: {e}"
         )
+    except RuntimeError as e:
+        return False, f"Failed to prepare audio for transcription: {e}"
     except Exception as e:
         return False, f"Unexpected error during transcription: {e}"
     finally:
-        # cleanup main tmp wav
+        checkpoint.close()
+        out_fp.close()
+
+
+def list_audio_files(folder: str) -> list[str]:
+    """Files directly inside folder with a supported extension, sorted by name."""
+    try:
+        names = sorted(os.listdir(folder), key=str.lower)
+    except OSError:
+        return []
+    return [
+        os.path.join(folder, n) for n in names
+        if os.path.splitext(n)[1].lower() in SUPPORTED_EXTENSIONS and os.path.isfile(os.path.join(folder, n))
+    ]
+
+
+def convert_audio_batch(jobs, language: str = 'pt-BR', workers: int | None = None, backend=None,
+                        recognize_workers: int = RECOGNIZE_WORKERS, on_progress=None):
+    """Transcribe many files with at most `workers` files in progress at once.
+
+    jobs is an iterable of (audio_file, text_file). Yields (audio_file,
+    text_file, success, message) as each file finishes, in completion order;
+    a failing file is reported and never stalls the queue. Each running file
+    decodes in its own ffmpeg process, so decoding of one file overlaps
+    recognition of another. on_progress(audio_file, percent) is called from
+    worker threads.
+    """
+    jobs = list(jobs)
+    workers = max(1, int(workers or AUDIO_BATCH_WORKERS))
+    # Look ffmpeg up once here and hand the paths to every file; only a call on the Tk
+    # main thread may offer the download, so GUI callers resolve it before starting a thread.
+    ffmpeg_paths = resolve_ffmpeg() if any(needs_ffmpeg(src) for src, _ in jobs) else None
+    if not isinstance(backend, RecognizerBackend):
+        backend = get_backend(backend)
+
+    def _run(job):
+        src, dst = job
+        cb = (lambda pct: on_progress(src, pct)) if on_progress else None
         try:
-            if wav_path and os.path.exists(wav_path):
-                os.remove(wav_path)
-        except Exception:
-            pass
\ No newline at end of file
+            return convert_audio_to_text(src, dst, language, progress=cb,
+                                         workers=recognize_workers, backend=backend, ffmpeg_paths=ffmpeg_paths)
+        except Exception as e:
+            return False, f"Error: {e}"
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run, job): job for job in jobs}
+        for fut in as_completed(futures):
+            src, dst = futures[fut]
+            ok, msg = fut.result()
+            yield src, dst, ok, msg
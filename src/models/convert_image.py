@@ -3,9 +3,12 @@ from tkinter import filedialog, messagebox, ttk
 from PIL import Image
 import warnings
 import os
-import img2pdf
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from src.utils.user_settings import get_setting, set_setting
 from src.services.conversion_service import ConversionService
+from src.utils.pdf_stream import write_images_to_pdf
+from src.utils.conversion_cache import ConversionCache
+from src.utils.output_paths import reserve_output_path
 
 class ImageConverter:
     """
@@ -133,30 +136,9 @@ class ImageConverter:
             # User cancelled the save dialog; do nothing silently.
             return
 
-        # Preprocess images: flatten alpha channels (img2pdf refuses images with alpha)
-        tmp_paths = []
-        def _prepare_no_alpha(path: str) -> str:
-            try:
-                with Image.open(path) as im:
-                    if im.mode in ("RGBA", "LA") or (im.mode == "P" and 'transparency' in im.info):
-                        rgb = Image.new("RGB", im.size, (255, 255, 255))
-                        if im.mode != "RGBA":
-                            im = im.convert("RGBA")
-                        rgb.paste(im, mask=im.split()[3])
-                        import tempfile
-                        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".jpg")
-                        tmp_paths.append(tmp.name); tmp.close()
-                        rgb.save(tmp.name, format='JPEG', quality=95)
-                        return tmp.name
-            except Exception:
-                pass
-            return path
-
-        prepared = [_prepare_no_alpha(p) for p in image_files]
-
+        # Pages are written one by one; alpha is flattened in memory per image
         try:
-            with open(output_pdf_path, "wb") as f:
-                f.write(img2pdf.convert(prepared))
+            write_images_to_pdf(image_files, output_pdf_path)
             messagebox.showinfo("Success", f"PDF created successfully!\nSaved at: {output_pdf_path}")
             try:
                 # Log with first image as input exemplar
@@ -165,22 +147,42 @@ class ImageConverter:
             except Exception:
                 pass
         except Exception as e:
+            # Do not leave a truncated PDF behind
+            try: os.remove(output_pdf_path)
+            except Exception: pass
             messagebox.showerror("Error", f"Error during conversion: {e}")
             try:
                 first_input = image_files[0] if image_files else None
                 ConversionService().log_error("images_to_pdf", first_input, str(e))
             except Exception:
                 pass
-        finally:
-            for p in tmp_paths:
-                try: os.remove(p)
-                except Exception: pass
 
     def process_conversion(self, output_format, image_files, out_dir):
         """
         Converts each selected image into the chosen output format.
         If an output file already exists, asks the user whether to overwrite it.
+        All overwrite prompts are answered before any work starts; larger batches
+        are then converted in a process pool sized to the CPU count.
         """
+        total = len(image_files)
+
+        # Resolve skips/overwrites up front so no worker ever waits on a dialog
+        jobs: list[tuple[str, str]] = []
+        taken: set[str] = set()  # two inputs must never share an output (a.png, a.bmp -> a.jpg)
+        for file in image_files:
+            input_extension = os.path.splitext(file)[1][1:].lower()
+            if input_extension == output_format:
+                continue  # Skip if already in desired format
+
+            base_name = os.path.splitext(os.path.basename(file))[0]
+            output_path = reserve_output_path(os.path.join(out_dir, f"{base_name}.{output_format}"), taken, file)
+
+            if os.path.exists(output_path):
+                response = messagebox.askyesno("Overwrite File", f"{output_path} already exists.\nOverwrite?")
+                if not response:
+                    continue
+            jobs.append((file, output_path))
+
         # Simple determinate progress window
         prog = tk.Toplevel(self.root)
         prog.title("Converting images")
@@ -192,83 +194,191 @@ class ImageConverter:
         bar = ttk.Progressbar(prog, mode='determinate', maximum=100, variable=var, length=300)
         bar.pack(pady=8)
 
-        total = len(image_files)
         done = 0
         converted = 0
+        # Counted here: each pool worker has its own ConversionCache and its counters die with it
+        cache_hits = 0
+        cache_misses = 0
+        # Workers store every fresh output; keep a running size here and evict as results arrive,
+        # so a long batch never pushes the cache far past its cap before the end
+        cache = _image_cache()
+        cache_bytes = cache.usage_bytes()
         errors: list[str] = []
         logger = ConversionService()
 
-        for file in image_files:
-            input_extension = os.path.splitext(file)[1][1:].lower()
-            if input_extension == output_format:
-                continue  # Skip if already in desired format
-
-            base_name = os.path.splitext(os.path.basename(file))[0]
-            output_path = os.path.join(out_dir, f"{base_name}.{output_format}")
-
-            if os.path.exists(output_path):
-                response = messagebox.askyesno("Overwrite File", f"{output_path} already exists.\nOverwrite?")
-                if not response:
-                    continue
-
-            try:
-                with Image.open(file) as img:
-                    fmt = output_format.lower()
-                    # Adjust save strategy for very large images to reduce memory spikes
-                    try:
-                        w, h = img.size
-                        px = w * h
-                        is_huge = px >= 100_000_000  # ~100 MP threshold
-                    except Exception:
-                        is_huge = False
-                    if fmt in ('jpg', 'jpeg'):
-                        # Ensure no alpha channel: flatten onto white background if needed
-                        if img.mode in ("RGBA", "LA") or (img.mode == "P" and 'transparency' in img.info):
-                            img = img.convert("RGBA")
-                            bg = Image.new("RGB", img.size, (255, 255, 255))
-                            bg.paste(img, mask=img.split()[3])
-                            img = bg
-                        else:
-                            img = img.convert("RGB")
-                        # For huge images, avoid optimize/subsampling=0 to curb RAM usage
-                        if is_huge:
-                            img.save(output_path, format='JPEG', quality=90)
-                        else:
-                            img.save(output_path, format='JPEG', quality=100, subsampling=0, optimize=True)
-                    else:
-                        # For formats supporting alpha, keep original mode
-                        if fmt == 'png' and is_huge:
-                            # Avoid expensive optimizations on huge PNGs
-                            img.save(output_path, format='PNG', compress_level=6, optimize=False)
-                        else:
-                            img.save(output_path, format=output_format.upper())
-                    converted += 1
+        for file, output_path, ok, detail, hit, miss in _iter_conversions(jobs, output_format):
+            cache_hits += int(hit)
+            cache_misses += int(miss)
+            if ok:
+                converted += 1
+                if miss:
                     try:
-                        logger.log_success("image_convert", file, output_path)
+                        size = os.path.getsize(output_path)
+                        if cache.storable(size):
+                            cache_bytes += size
+                        if cache_bytes > cache.max_bytes:
+                            cache_bytes = cache.trim_margin()
                     except Exception:
                         pass
-            except Exception as e:
-                errors.append(f"{os.path.basename(file)}: {e}")
                 try:
-                    logger.log_error("image_convert", file, str(e))
+                    logger.log_success("image_convert", file, output_path)
                 except Exception:
                     pass
-            finally:
-                done += 1
-                pct = (done/total) * 100.0
+            else:
+                errors.append(f"{os.path.basename(file)}: {detail}")
                 try:
-                    var.set(pct); bar.update_idletasks()
+                    logger.log_error("image_convert", file, detail)
                 except Exception:
                     pass
+            done += 1
+            pct = (done/max(1, len(jobs))) * 100.0
+            try:
+                var.set(pct); bar.update_idletasks()
+            except Exception:
+                pass
 
         try:
             prog.destroy()
         except Exception:
             pass
+        # Final exact pass (the running total above is an estimate)
+        try:
+            cache.trim()
+        except Exception:
+            pass
 
+        cache_note = f"\n\nCache: {cache_hits} hit(s), {cache_misses} miss(es)"
         if errors and converted == 0:
-            messagebox.showerror("Error", "No images were converted.\n" + "\n".join(errors[:5]))
+            messagebox.showerror("Error", "No images were converted.\n" + "\n".join(errors[:5]) + cache_note)
         elif errors:
-            messagebox.showwarning("Partial Success", f"Converted {converted}/{total} images. Some failed:\n" + "\n".join(errors[:5]))
+            messagebox.showwarning("Partial Success", f"Converted {converted}/{total} images. Some failed:\n" + "\n".join(errors[:5]) + cache_note)
         else:
-            messagebox.showinfo("Success", f"Converted {converted}/{total} images successfully!")
\ No newline at end of file
+            messagebox.showinfo("Success", f"Converted {converted}/{total} images successfully!{cache_note}")
+
+
+# Batches smaller than this run in-process; spawning workers costs more than it saves.
+PARALLEL_MIN_FILES = 4
+
+
+def _batch_workers(n_jobs: int) -> int:
+    """Number of worker processes for a batch of n_jobs files (one per CPU)."""
+    return max(1, min(n_jobs, os.cpu_count() or 1))
+
+
+# Rows per strip on the huge-image path; transient buffers are strip-sized, not image-sized.
+HUGE_STRIP_ROWS = 512
+
+
+def _flatten_to_rgb_strips(img: Image.Image, rows: int = HUGE_STRIP_ROWS) -> Image.Image:
+    """
+    Builds an RGB copy of img one horizontal strip at a time, compositing any
+    alpha onto white per strip instead of allocating full-size RGBA and
+    background copies.
+    """
+    w, h = img.size
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and 'transparency' in img.info)
+    out = Image.new("RGB", (w, h))
+    for top in range(0, h, rows):
+        box = (0, top, w, min(h, top + rows))
+        strip = img.crop(box)
+        if has_alpha:
+            strip = strip.convert("RGBA")
+            flat = Image.new("RGB", strip.size, (255, 255, 255))
+            flat.paste(strip, mask=strip.getchannel("A"))
+            strip = flat
+        elif strip.mode != "RGB":
+            strip = strip.convert("RGB")
+        out.paste(strip, (0, top))
+    return out
+
+
+# Bump when the save parameters below change so stale cache entries stop matching.
+_SAVE_PROFILE = "jpeg:q100-ss0-opt/huge-q90;png:huge-c6;v1"
+
+_cache: ConversionCache | None = None
+
+
+def _image_cache() -> ConversionCache:
+    """Per-process cache handle (each pool worker creates its own)."""
+    global _cache
+    if _cache is None:
+        _cache = ConversionCache("images")
+    return _cache
+
+
+def _convert_single(file: str, output_path: str, output_format: str) -> tuple[bool, str, bool, bool]:
+    """
+    Decodes, converts and encodes one image.
+    Returns (success, output path or error, cache hit, cache miss).
+    Identical inputs converted with the same parameters are served from the result cache.
+    Runs inside pool workers, so it must stay at module level and never touch Tk.
+    """
+    cache = _image_cache()
+    key = cache.make_key(file, output_format.lower(), _SAVE_PROFILE)
+    if cache.fetch(key, output_format, output_path):
+        return True, output_path, True, False
+    try:
+        with Image.open(file) as img:
+            fmt = output_format.lower()
+            # Adjust save strategy for very large images to reduce memory spikes
+            try:
+                w, h = img.size
+                px = w * h
+                is_huge = px >= 100_000_000  # ~100 MP threshold
+            except Exception:
+                is_huge = False
+            if fmt in ('jpg', 'jpeg') and is_huge:
+                # Flatten strip by strip, then release the decoded source before encoding
+                rgb = _flatten_to_rgb_strips(img)
+                img.close()
+                rgb.save(output_path, format='JPEG', quality=90)
+            elif fmt in ('jpg', 'jpeg'):
+                # Ensure no alpha channel: flatten onto white background if needed
+                if img.mode in ("RGBA", "LA") or (img.mode == "P" and 'transparency' in img.info):
+                    img = img.convert("RGBA")
+                    bg = Image.new("RGB", img.size, (255, 255, 255))
+                    bg.paste(img, mask=img.split()[3])
+                    img = bg
+                else:
+                    img = img.convert("RGB")
+                img.save(output_path, format='JPEG', quality=100, subsampling=0, optimize=True)
+            else:
+                # For formats supporting alpha, keep original mode
+                if fmt == 'png' and is_huge:
+                    # Avoid expensive optimizations on huge PNGs
+                    img.save(output_path, format='PNG', compress_level=6, optimize=False)
+                else:
+                    img.save(output_path, format=output_format.upper())
+        cache.store(key, output_format, output_path)
+        return True, output_path, False, True
+    except Exception as e:
+        return False, str(e), False, True
+
+
+def _iter_conversions(jobs: list[tuple[str, str]], output_format: str):
+    """
+    Yields (input, output, success, detail, cache hit, cache miss) per job as each one finishes.
+    Uses a process pool for larger batches and falls back to in-process
+    conversion when the pool cannot be started.
+    """
+    workers = _batch_workers(len(jobs))
+    if workers > 1 and len(jobs) >= PARALLEL_MIN_FILES:
+        try:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        except Exception:
+            pool = None
+        if pool is not None:
+            with pool:
+                futures = {pool.submit(_convert_single, f, o, output_format): (f, o) for f, o in jobs}
+                for fut in as_completed(futures):
+                    f, o = futures[fut]
+                    try:
+                        ok, detail, hit, miss = fut.result()
+                    except Exception as e:
+                        # e.g. BrokenProcessPool when a worker dies mid-decode
+                        ok, detail, hit, miss = False, str(e), False, False
+                    yield f, o, ok, detail, hit, miss
+            return
+    for f, o in jobs:
+        ok, detail, hit, miss = _convert_single(f, o, output_format)
+        yield f, o, ok, detail, hit, miss
@@ -1,25 +1,339 @@
 import threading
-import time
 import cv2
 import os
-import re
-import sys
+import json
+import shutil
+import tempfile
 import subprocess
-from tkinter import filedialog, messagebox, ttk, Toplevel, DoubleVar
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tkinter import filedialog, messagebox, ttk, Toplevel, DoubleVar, StringVar
 from src.utils.user_settings import get_setting, set_setting
-from src.utils.ffmpeg_finder import ensure_ffmpeg
+from src.utils.ffmpeg_finder import resolve_ffmpeg, no_window_popen_kwargs
 from src.services.conversion_service import ConversionService
 
 def get_video_duration(video_file):
     """
-    Returns the duration of the video in seconds using OpenCV.
+    Returns the duration of the video in seconds using OpenCV, or None when it can't be estimated.
+    Only a fallback: ffprobe's duration (see probe_media) takes precedence.
     """
     cap = cv2.VideoCapture(video_file)
     total_frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
     fps = cap.get(cv2.CAP_PROP_FPS)
-    duration = total_frames / fps if fps > 0 else 1
     cap.release()
-    return duration
+    if fps <= 0 or total_frames <= 0:
+        return None
+    return total_frames / fps
+
+
+@dataclass
+class FfmpegProgress:
+    """One block of ffmpeg's machine-readable -progress output."""
+    out_time_s: float
+    percent: float            # 0–100 against the known duration (capped at 99.9 until done)
+    speed: float | None       # realtime multiple, e.g. 2.5 for "2.5x"
+    fps: float | None
+    total_size: int | None    # bytes written so far
+    eta_s: float | None
+    done: bool
+
+
+def _ffmpeg_exe() -> str:
+    # Cached after the first lookup; never prompts from worker threads
+    return resolve_ffmpeg()[0]
+
+
+def _ffprobe_exe() -> str:
+    return resolve_ffmpeg()[1]
+
+
+def _codecs_for(output_format: str) -> tuple[str, str]:
+    fmt = output_format.lower()
+    if fmt == 'avi':
+        return 'mpeg4', 'mp3'
+    # mp4, mov and anything else
+    return 'libx264', 'aac'
+
+
+# Codecs each target container can hold as-is, so a container change is a plain remux
+_COPY_COMPATIBLE = {
+    'mp4': {'video': {'h264', 'hevc', 'mpeg4', 'av1'}, 'audio': {'aac', 'mp3', 'ac3', 'eac3', 'alac', 'opus'}},
+    'mov': {'video': {'h264', 'hevc', 'mpeg4', 'prores', 'mjpeg'}, 'audio': {'aac', 'mp3', 'ac3', 'alac', 'pcm_s16le', 'pcm_s24le'}},
+    'avi': {'video': {'mpeg4', 'h264', 'mjpeg', 'msmpeg4v2', 'msmpeg4v3'}, 'audio': {'mp3', 'ac3', 'pcm_s16le'}},
+}
+
+
+def probe_media(input_file: str) -> dict | None:
+    """Return {'duration': float | None, 'video': codec | None, 'audio': codec | None} via ffprobe.
+
+    Only the first video and audio streams are reported (the ones a remux maps with
+    0:V:0 / 0:a:0; attached pictures such as cover art are skipped, as 0:V does).
+    Returns None when ffprobe is unavailable or fails.
+    """
+    cmd = [
+        _ffprobe_exe(), '-v', 'error',
+        '-show_entries', 'format=duration:stream=codec_type,codec_name:stream_disposition=attached_pic',
+        '-of', 'json', input_file,
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=60, **no_window_popen_kwargs())
+        if out.returncode != 0:
+            return None
+        data = json.loads(out.stdout or '{}')
+    except Exception:
+        return None
+    info: dict = {'duration': _to_float((data.get('format') or {}).get('duration')), 'video': None, 'audio': None}
+    for st in data.get('streams') or []:
+        kind = st.get('codec_type')
+        # Cover art shows up as a video stream; it is not what we want to remux
+        if kind == 'video' and (st.get('disposition') or {}).get('attached_pic'):
+            continue
+        if kind in ('video', 'audio') and info[kind] is None:
+            info[kind] = st.get('codec_name')
+    return info
+
+
+def can_stream_copy(info: dict | None, output_format: str) -> bool:
+    """True if the probed streams can go into output_format without re-encoding."""
+    allowed = _COPY_COMPATIBLE.get(output_format.lower())
+    if not info or not allowed or not info.get('video'):
+        return False
+    if info['video'] not in allowed['video']:
+        return False
+    return info.get('audio') is None or info['audio'] in allowed['audio']
+
+
+def _to_float(value: str | None) -> float | None:
+    try:
+        return float(str(value).strip().rstrip('x'))
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_ffmpeg_progress(lines, duration: float | None):
+    """Parse key=value lines from `ffmpeg -progress` into FfmpegProgress events.
+
+    ffmpeg emits one block per update, terminated by progress=continue|end.
+    """
+    block: dict[str, str] = {}
+    for raw in lines:
+        line = raw.strip()
+        if '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        block[key] = value
+        if key != 'progress':
+            continue
+        done = value == 'end'
+        # out_time_us is the documented key; older builds only emit out_time_ms (also microseconds)
+        us = _to_float(block.get('out_time_us') or block.get('out_time_ms'))
+        out_time = max(0.0, (us or 0.0) / 1_000_000.0)
+        speed = _to_float(block.get('speed'))
+        if duration and duration > 0:
+            percent = 100.0 if done else min(99.9, out_time / duration * 100.0)
+            eta = max(0.0, (duration - out_time) / speed) if speed else None
+        else:
+            percent, eta = (100.0 if done else 0.0), None
+        size = _to_float(block.get('total_size'))
+        yield FfmpegProgress(
+            out_time_s=out_time,
+            percent=percent,
+            speed=speed,
+            fps=_to_float(block.get('fps')),
+            total_size=int(size) if size is not None else None,
+            eta_s=0.0 if done else eta,
+            done=done,
+        )
+        block = {}
+
+
+def run_ffmpeg(args: list[str], duration: float | None = None, on_progress=None, proc_holder=None) -> tuple[int, str]:
+    """Run ffmpeg with `args` (everything after the executable) and stream progress.
+
+    on_progress receives FfmpegProgress events parsed from `-progress pipe:1`.
+    proc_holder, if given, is a list the Popen object is appended to so callers
+    can terminate every process a conversion started. Returns (returncode, last
+    lines of stderr).
+    """
+    cmd = [_ffmpeg_exe(), '-hide_banner', '-nostats', '-progress', 'pipe:1'] + list(args)
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        bufsize=1,
+        **no_window_popen_kwargs(),
+    )
+    if proc_holder is not None:
+        proc_holder.append(process)
+    # Drain stderr on the side so neither pipe can fill up and block ffmpeg
+    tail: deque[str] = deque(maxlen=20)
+    drain = threading.Thread(target=lambda: tail.extend(process.stderr), daemon=True)
+    drain.start()
+    for event in iter_ffmpeg_progress(process.stdout, duration):
+        if on_progress:
+            try:
+                on_progress(event)
+            except Exception:
+                pass
+    process.wait()
+    drain.join(timeout=5)
+    return process.returncode, "".join(tail).strip()
+
+
+def format_progress_status(event: FfmpegProgress) -> str:
+    """Short human-readable line, e.g. '2.4x · 58 fps · ETA 1:05'."""
+    parts = []
+    if event.speed:
+        parts.append(f"{event.speed:.1f}x")
+    if event.fps:
+        parts.append(f"{event.fps:.0f} fps")
+    if event.eta_s is not None and not event.done:
+        m, sec = divmod(int(event.eta_s), 60)
+        h, m = divmod(m, 60)
+        parts.append(f"ETA {h}:{m:02d}:{sec:02d}" if h else f"ETA {m}:{sec:02d}")
+    return " · ".join(parts)
+
+# Encoder threads given to each ffmpeg process in batch mode; the default
+# number of concurrent jobs is the core count divided by this.
+FFMPEG_THREADS_PER_JOB = 4
+
+
+def default_batch_workers() -> int:
+    """Default number of concurrent ffmpeg processes for batch conversion."""
+    return max(1, (os.cpu_count() or 1) // FFMPEG_THREADS_PER_JOB)
+
+
+# Segment-parallel encoding only pays off for long inputs on machines with room for 2+ encoders
+SEGMENT_MIN_DURATION = 600.0  # seconds
+SEGMENT_MIN_LENGTH = 60.0     # seconds per segment (cuts land on the next keyframe)
+
+
+def _segmented_encode(input_file: str, output_file: str, output_format: str, duration: float,
+                      workers: int, on_progress=None, proc_holder=None,
+                      cancelled: threading.Event | None = None) -> tuple[int, str]:
+    """Split the video stream at keyframes, encode segments in parallel, then join them.
+
+    1. Stream-copy the first video stream (not cover art) into ~equal segments (segment muxer).
+    2. Encode every segment with its own ffmpeg process (video only).
+    3. Join the encoded segments losslessly with the concat demuxer while the
+       audio is encoded once from the original input, so there are no
+       encoder-priming gaps at segment boundaries.
+    Progress is reported as 0–5% split, 5–90% encode (summed over segments), 90–100% join.
+    """
+    vcodec, acodec = _codecs_for(output_format)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    seg_len = max(SEGMENT_MIN_LENGTH, duration / (workers * 2))  # 2 segments per worker balances uneven ones
+    work_dir = tempfile.mkdtemp(prefix='.dotformat_seg_', dir=os.path.dirname(os.path.abspath(output_file)))
+
+    def emit(percent: float, out_time: float, speed: float | None = None, fps: float | None = None,
+             size: int | None = None):
+        if not on_progress:
+            return
+        eta = max(0.0, (duration - out_time) / speed) if speed else None
+        try:
+            on_progress(FfmpegProgress(out_time, min(99.9, percent), speed, fps, size, eta, False))
+        except Exception:
+            pass
+
+    try:
+        code, err = run_ffmpeg(
+            ['-y', '-i', input_file, '-map', '0:V:0', '-an', '-sn', '-dn', '-c', 'copy',
+             '-f', 'segment', '-segment_time', f"{seg_len:.3f}", '-reset_timestamps', '1',
+             os.path.join(work_dir, 'seg_%05d.mkv')],
+            duration, lambda ev: emit(ev.percent * 0.05, 0.0), proc_holder,
+        )
+        if code != 0:
+            return code, err
+        segments = sorted(f for f in os.listdir(work_dir) if f.startswith('seg_'))
+        if not segments or (cancelled is not None and cancelled.is_set()):
+            return 1, err or "Splitting produced no segments."
+
+        lock = threading.Lock()
+        seg_state: dict[str, FfmpegProgress] = {}
+
+        def on_segment(name: str, ev: FfmpegProgress):
+            with lock:
+                seg_state[name] = ev
+                done_s = sum(e.out_time_s for e in seg_state.values())
+                running = [e for e in seg_state.values() if not e.done]
+                speed = sum(e.speed or 0.0 for e in running) or None
+                fps = sum(e.fps or 0.0 for e in running) or None
+                size = sum(e.total_size or 0 for e in seg_state.values())
+            emit(5.0 + 85.0 * min(1.0, done_s / duration), done_s, speed, fps, size)
+
+        def encode(name: str) -> tuple[int, str]:
+            if cancelled is not None and cancelled.is_set():
+                return 1, "Cancelled."
+            return run_ffmpeg(
+                ['-y', '-i', os.path.join(work_dir, name), '-an', '-vcodec', vcodec,
+                 '-threads', str(threads), os.path.join(work_dir, 'enc_' + name[4:])],
+                None, lambda ev: on_segment(name, ev), proc_holder,
+            )
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(encode, segments))
+        for code, err in results:
+            if code != 0:
+                return code, err
+
+        # Relative names: the concat demuxer resolves them against the list file's folder
+        list_path = os.path.join(work_dir, 'segments.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for name in segments:
+                f.write(f"file 'enc_{name[4:]}'\n")
+        args = ['-y', '-f', 'concat', '-safe', '0', '-i', list_path, '-i', input_file,
+                '-map', '0:v:0', '-map', '1:a:0?', '-c:v', 'copy', '-acodec', acodec]
+        if output_format.lower() in ('mp4', 'mov'):
+            args += ['-movflags', '+faststart']
+        return run_ffmpeg(
+            args + [output_file], duration,
+            lambda ev: emit(90.0 + ev.percent * 0.1, ev.out_time_s, ev.speed, ev.fps, ev.total_size),
+            proc_holder,
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _transcode(input_file: str, output_file: str, output_format: str, threads: int | None = None,
+               duration: float | None = None, on_progress=None, proc_holder=None,
+               cancelled: threading.Event | None = None, segmented: bool = False) -> tuple[int, str, bool]:
+    """Convert with a stream-copy remux when the codecs allow it, else re-encode.
+
+    A failed remux falls back to re-encoding unless `cancelled` is set. With
+    segmented=True, long inputs are re-encoded in parallel segments (falling
+    back to a single ffmpeg process if that fails).
+    `duration` is only a fallback for when ffprobe reports none (the cv2
+    estimate is unreliable for many containers).
+    Returns (returncode, stderr tail, remuxed).
+    """
+    info = probe_media(input_file)
+    if info and info.get('duration'):
+        duration = info['duration']
+    if can_stream_copy(info, output_format):
+        # 0:V (capital) skips attached pictures, matching the stream probe_media checked
+        args = ['-y', '-i', input_file, '-map', '0:V:0', '-map', '0:a:0?', '-c', 'copy']
+        if output_format.lower() in ('mp4', 'mov'):
+            if info.get('video') == 'hevc':
+                args += ['-tag:v', 'hvc1']  # Apple players reject the default hev1 tag
+            args += ['-movflags', '+faststart']
+        returncode, err = run_ffmpeg(args + [output_file], duration, on_progress, proc_holder)
+        if returncode == 0 or (cancelled is not None and cancelled.is_set()):
+            return returncode, err, True
+    workers = default_batch_workers()
+    if segmented and duration and duration >= SEGMENT_MIN_DURATION and workers >= 2:
+        returncode, err = _segmented_encode(input_file, output_file, output_format, duration, workers,
+                                            on_progress, proc_holder, cancelled)
+        if returncode == 0 or (cancelled is not None and cancelled.is_set()):
+            return returncode, err, False
+    vcodec, acodec = _codecs_for(output_format)
+    args = ['-y', '-i', input_file, '-vcodec', vcodec, '-acodec', acodec]
+    if threads:
+        args += ['-threads', str(int(threads))]
+    returncode, err = run_ffmpeg(args + [output_file], duration, on_progress, proc_holder)
+    return returncode, err, False
 
 def convert_video_choice(root, output_format):
     """
@@ -54,13 +368,16 @@ def convert_video_choice(root, output_format):
         # User cancelled the save dialog; do nothing.
         return
 
-    # Get video duration in seconds for progress calculation
+    # Find ffmpeg (offering the download if needed) here on the Tk thread, not in the worker
+    resolve_ffmpeg()
+
+    # Rough cv2 estimate; _transcode prefers ffprobe's duration and uses this only if the probe has none
     total_duration = get_video_duration(video_file)
 
     # --- Progress Window Setup ---
     progress_win = Toplevel(root)
     progress_win.title("Converting Video")
-    progress_win.geometry("400x120")
+    progress_win.geometry("400x140")
     progress_win.resizable(False, False)
     progress_win.grab_set()
 
@@ -70,120 +387,59 @@ def convert_video_choice(root, output_format):
 
     progress_var = DoubleVar()
     progress_bar = ttk.Progressbar(progress_win, variable=progress_var, maximum=100, length=350)
-    progress_bar.pack(pady=10)
+    progress_bar.pack(pady=(10, 4))
+    status_var = StringVar(value="")
+    ttk.Label(progress_win, textvariable=status_var, foreground="#555").pack()
 
-    # This variable will hold the ffmpeg process so we can terminate it if needed
-    ffmpeg_process = [None]
+    # Every ffmpeg process started for this conversion, so closing the window can stop them all
+    ffmpeg_processes = []
+
+    cancelled = threading.Event()
 
     def on_close():
-        # If the user closes the window, terminate the ffmpeg process if running
-        if ffmpeg_process[0] is not None and ffmpeg_process[0].poll() is None:
-            ffmpeg_process[0].terminate()
+        # If the user closes the window, terminate the ffmpeg processes still running
+        cancelled.set()
+        running = [p for p in ffmpeg_processes if p.poll() is None]
+        for p in running:
+            p.terminate()
+        if running:
             messagebox.showinfo("Cancelled", "Video conversion cancelled.")
         progress_win.destroy()
 
     progress_win.protocol("WM_DELETE_WINDOW", on_close)
 
-    def _ffmpeg_exe() -> str:
-        ffmpeg, _ = ensure_ffmpeg(allow_download=True)
-        if ffmpeg and os.path.exists(str(ffmpeg)):
-            return str(ffmpeg)
-        return 'ffmpeg'
+    def on_progress(event: FfmpegProgress):
+        # Called from the worker thread; hand the update to Tk
+        try:
+            progress_win.after(0, lambda: (progress_var.set(event.percent), status_var.set(format_progress_status(event))))
+        except Exception:
+            pass
 
     def run_conversion():
         try:
-            # Build ffmpeg command
-            if output_format.lower() == 'mp4':
-                vcodec = 'libx264'
-                acodec = 'aac'
-            elif output_format.lower() == 'avi':
-                vcodec = 'mpeg4'
-                acodec = 'mp3'
-            elif output_format.lower() == 'mov':
-                vcodec = 'libx264'
-                acodec = 'aac'
-            else:
-                vcodec = 'libx264'
-                acodec = 'aac'
-
-            # Prepare ffmpeg command with progress info (use bundled ffmpeg if available)
-            cmd = [
-                _ffmpeg_exe(),
-                '-y',  # Overwrite output
-                '-i', video_file,
-                '-vcodec', vcodec,
-                '-acodec', acodec,
-                output_file
-            ]
-
-            # Start ffmpeg process using subprocess to capture output
-            # Hide console window on Windows
-            startupinfo = None
-            creationflags = 0
-            if os.name == 'nt':
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                bufsize=1,
-                startupinfo=startupinfo,
-                creationflags=creationflags,
+            returncode, err, remuxed = _transcode(
+                video_file, output_file, output_format,
+                duration=total_duration,
+                on_progress=on_progress,
+                proc_holder=ffmpeg_processes,
+                cancelled=cancelled,
+                segmented=True,
             )
-            ffmpeg_process[0] = process
-
-            # Regex to extract time= from ffmpeg output
-            time_pattern = re.compile(r'time=(\d+):(\d+):(\d+)\.(\d+)')
-
-            # Gentle nudge thread to avoid perceived freeze near the end
-            stop_nudge = threading.Event()
-            last_update = {'t': time.time()}
-
-            def nudger():
-                while not stop_nudge.is_set():
-                    time.sleep(0.25)
-                    # If no new update for 1.5s, nudge up to 99%
-                    if (time.time() - last_update['t']) > 1.5:
-                        cur = progress_var.get()
-                        if cur < 99.0 and process.poll() is None:
-                            progress_var.set(min(99.0, cur + 0.4))
-                            try:
-                                progress_win.update_idletasks()
-                            except Exception:
-                                pass
-            threading.Thread(target=nudger, daemon=True).start()
-
-            for line in process.stderr:
-                # Parse ffmpeg output for progress
-                match = time_pattern.search(line)
-                if match:
-                    h = int(match.group(1)); m = int(match.group(2)); s = int(match.group(3)); ms = float(match.group(4))
-                    current_time = h * 3600 + m * 60 + s + (ms / 100.0)
-                    # Cap parse-based progress at 98% to keep room for finalization
-                    percent = min((current_time / max(1e-6, total_duration)) * 100, 98.0)
-                    progress_var.set(percent)
-                    last_update['t'] = time.time()
-                    progress_win.update_idletasks()
-            process.wait()
-
-            # Stop nudger
-            stop_nudge.set()
-
-            if process.returncode == 0:
+
+            if returncode == 0:
                 progress_var.set(100)
                 progress_win.update_idletasks()
                 messagebox.showinfo("Success", "Video conversion completed successfully.")
                 try:
-                    ConversionService().log_success("video_convert", video_file, output_file)
+                    ConversionService().log_success("video_convert", video_file, output_file,
+                                                    detail="remux (stream copy)" if remuxed else None)
                 except Exception:
                     pass
             else:
                 messagebox.showerror("Error", "Conversion failed or was cancelled.")
                 try:
-                    ConversionService().log_error("video_convert", video_file, "Conversion failed or cancelled")
+                    detail = err.splitlines()[-1] if err else "Conversion failed or cancelled"
+                    ConversionService().log_error("video_convert", video_file, detail)
                 except Exception:
                     pass
         except Exception as e:
@@ -198,59 +454,53 @@ def convert_video_choice(root, output_format):
     # Start conversion in a separate thread to keep UI responsive
     threading.Thread(target=run_conversion, daemon=True).start()
 
-def convert_video_file(input_file: str, output_file: str, output_format: str) -> tuple[bool, str]:
+def convert_video_file(input_file: str, output_file: str, output_format: str, threads: int | None = None,
+                       progress=None) -> tuple[bool, str]:
     """Convert a single video file without UI. Returns (success, message).
 
     Uses ffmpeg via subprocess and blocks until completion.
+    threads, if given, caps ffmpeg's encoder threads (used by batch mode).
+    progress, if given, receives FfmpegProgress events.
     """
     try:
-        # Choose codecs based on extension
-        fmt = output_format.lower()
-        if fmt == 'mp4':
-            vcodec, acodec = 'libx264', 'aac'
-        elif fmt == 'avi':
-            vcodec, acodec = 'mpeg4', 'mp3'
-        elif fmt == 'mov':
-            vcodec, acodec = 'libx264', 'aac'
-        else:
-            vcodec, acodec = 'libx264', 'aac'
-
-        # Resolve ffmpeg exe
-        def _ffmpeg_exe() -> str:
-            ffmpeg, _ = ensure_ffmpeg(allow_download=True)
-            if ffmpeg and os.path.exists(str(ffmpeg)):
-                return str(ffmpeg)
-            return 'ffmpeg'
-
-        cmd = [
-            _ffmpeg_exe(), '-y',
-            '-i', input_file,
-            '-vcodec', vcodec,
-            '-acodec', acodec,
-            output_file
-        ]
-        # Hide console window on Windows
-        startupinfo = None
-        creationflags = 0
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-            bufsize=1,
-            startupinfo=startupinfo,
-            creationflags=creationflags,
-        )
-        # Consume output to avoid blocking
-        for _ in process.stderr:
-            pass
-        process.wait()
-        if process.returncode == 0:
-            return True, "Converted successfully."
-        return False, "Conversion failed."
+        # Container-only changes are remuxed with -c copy; the probe also supplies the duration
+        returncode, err, remuxed = _transcode(input_file, output_file, output_format, threads=threads,
+                                              on_progress=progress)
+        if returncode == 0:
+            return True, "Remuxed successfully (streams copied)." if remuxed else "Converted successfully."
+        last = err.splitlines()[-1] if err else ""
+        return False, f"Conversion failed. {last}".strip()
     except Exception as e:
-        return False, f"Error: {e}"
\ No newline at end of file
+        return False, f"Error: {e}"
+
+
+def convert_video_batch(jobs, workers: int | None = None, threads: int | None = FFMPEG_THREADS_PER_JOB,
+                        on_progress=None):
+    """Convert many videos with at most `workers` ffmpeg processes running at once.
+
+    jobs is an iterable of (input_file, output_file, output_format). Yields
+    (input_file, output_file, success, message) as each job finishes, in
+    completion order. A failing job is reported and never stalls the queue.
+    on_progress(input_file, FfmpegProgress) is called from worker threads.
+    """
+    jobs = list(jobs)
+    workers = max(1, int(workers or default_batch_workers()))
+    # Look ffmpeg up before the workers start; it is cached for them. Only a call on the
+    # Tk main thread may offer the download, so GUI callers resolve it before starting a thread.
+    resolve_ffmpeg()
+
+    def _run(job):
+        src, dst, fmt = job
+        cb = (lambda ev: on_progress(src, ev)) if on_progress else None
+        try:
+            return convert_video_file(src, dst, fmt, threads=threads, progress=cb)
+        except Exception as e:
+            return False, f"Error: {e}"
+
+    # Threads are enough here: the heavy lifting happens in the ffmpeg child processes
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run, job): job for job in jobs}
+        for fut in as_completed(futures):
+            src, dst, _ = futures[fut]
+            ok, msg = fut.result()
+            yield src, dst, ok, msg
@@ -1,7 +1,9 @@
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import PyPDF2
 from pdf2docx import Converter
 import fitz  # PyMuPDF
+from PIL import Image
 
 def pdf_to_docx(pdf_file, docx_file):
     """
@@ -69,35 +71,131 @@ def protect_pdf(input_pdf, password, output_pdf):
         return False, str(e)
 
 
-def pdf_to_png(pdf_file, output_dir, dpi: int = 200):
+# Documents shorter than this are rendered in-process; worker start-up would dominate.
+PARALLEL_MIN_PAGES = 4
+
+# Per-process document handle, opened once by _init_render_worker
+_render_doc = None
+
+
+def _init_render_worker(pdf_file):
+    """Pool initializer: each worker opens its own fitz document handle."""
+    global _render_doc
+    _render_doc = fitz.open(pdf_file)
+
+
+def _close_render_worker():
+    global _render_doc
+    if _render_doc is not None:
+        _render_doc.close()
+        _render_doc = None
+
+
+def _page_png_path(output_dir: str, index: int) -> str:
+    return os.path.join(output_dir, f"page_{index + 1}.png")
+
+
+def _page_already_exported(output_dir: str, index: int, dpi: int) -> bool:
+    """True if page_<n>.png exists and its PNG pHYs metadata matches dpi."""
+    path = _page_png_path(output_dir, index)
+    if not os.path.exists(path):
+        return False
+    try:
+        with Image.open(path) as im:
+            saved = im.info.get("dpi")
+        # pHYs stores pixels per metre, so allow for rounding on the way back
+        return bool(saved) and abs(float(saved[0]) - dpi) < 1.0 and abs(float(saved[1]) - dpi) < 1.0
+    except Exception:
+        return False
+
+
+def _render_page(index: int, output_dir: str, dpi: int) -> int:
+    """Rasterizes one page with the worker's document and writes page_<n>.png. Returns index."""
+    zoom = dpi / 72.0  # 72 DPI is the PDF default
+    page = _render_doc.load_page(index)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    pix.set_dpi(dpi, dpi)
+    # Write under a temporary name so an interrupted run never leaves a truncated page_<n>.png
+    final_path = _page_png_path(output_dir, index)
+    tmp_path = final_path + ".part"
+    pix.save(tmp_path, output="png")
+    os.replace(tmp_path, final_path)
+    return index
+
+
+def pdf_to_png(pdf_file, output_dir, dpi: int = 200, progress=None,
+               first_page: int | None = None, last_page: int | None = None, resume: bool = False):
     """
     Converts each page of a PDF file into individual PNG images using PyMuPDF
     (no Poppler required on Windows).
 
+    Pages are spread over a process pool (one worker per CPU, each with its own
+    document handle), so one worker encodes a PNG while others rasterize.
+
     Args:
         pdf_file (str): Path to the input PDF.
         output_dir (str): Directory where PNG files will be saved.
         dpi (int): Render resolution. 300 DPI is a good default.
+        progress (callable | None): Receives 0–100 as pages complete.
+        first_page, last_page (int | None): Optional 1-based inclusive page range.
+        resume (bool): Skip pages whose page_<n>.png already exists with the same DPI.
 
     Returns:
         tuple[bool, str]: (success, message)
     """
     if not pdf_file or not output_dir:
         return False, "Missing input PDF or output directory."
+
+    def _report(done: int, total: int):
+        if progress:
+            try:
+                progress((done / max(1, total)) * 100.0)
+            except Exception:
+                pass
+
     try:
         os.makedirs(output_dir, exist_ok=True)
         # Open PDF; for encrypted PDFs, this will raise unless previously unlocked
         doc = fitz.open(pdf_file)
         try:
-            zoom = dpi / 72.0  # 72 DPI is the PDF default
-            mat = fitz.Matrix(zoom, zoom)
-            for i in range(doc.page_count):
-                page = doc.load_page(i)
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-                output_path = os.path.join(output_dir, f"page_{i + 1}.png")
-                pix.save(output_path)
+            page_count = doc.page_count
         finally:
             doc.close()
-        return True, f"Images successfully saved in '{output_dir}'!"
+        start = 1 if first_page is None else int(first_page)
+        end = page_count if last_page is None else min(int(last_page), page_count)
+        if start < 1 or start > end:
+            return False, f"Invalid page range {start}-{end} (document has {page_count} pages)."
+        pages = list(range(start - 1, end))
+        skipped = 0
+        if resume:
+            remaining = [i for i in pages if not _page_already_exported(output_dir, i, dpi)]
+            skipped = len(pages) - len(remaining)
+            pages = remaining
+        total = len(pages)
+        _report(0, total)
+
+        workers = max(1, min(total, os.cpu_count() or 1))
+        pool = None
+        if workers > 1 and total >= PARALLEL_MIN_PAGES:
+            try:
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker, initargs=(pdf_file,))
+            except Exception:
+                pool = None
+        if pool is not None:
+            with pool:
+                futures = [pool.submit(_render_page, i, output_dir, dpi) for i in pages]
+                for done, fut in enumerate(as_completed(futures), start=1):
+                    fut.result()
+                    _report(done, total)
+        else:
+            _init_render_worker(pdf_file)
+            try:
+                for done, i in enumerate(pages, start=1):
+                    _render_page(i, output_dir, dpi)
+                    _report(done, total)
+            finally:
+                _close_render_worker()
+        note = f" ({skipped} page(s) already exported were skipped)" if skipped else ""
+        return True, f"Images successfully saved in '{output_dir}'!{note}"
     except Exception as e:
-        return False, str(e)
\ No newline at end of file
+        return False, str(e)
@@ -7,11 +7,110 @@ are not installed. Errors are reported with friendly dialogs.
 
 from tkinter import filedialog, messagebox, Toplevel, Button, Scale, Canvas, Label
 from src.utils.user_settings import get_setting, set_setting
+from src.utils.output_paths import reserve_output_path
 from PIL import Image, ImageFilter, ImageTk
 import warnings
 import os
+import threading
 from src.services.conversion_service import ConversionService
 
+# rembg model used when the "rembg_model" setting is unset
+DEFAULT_MODEL = "u2net"
+
+# Process-wide rembg sessions keyed by model name. Creating a session loads the
+# ONNX model and builds the inference graph, which costs far more than running it
+# on a typical photo, so each model is loaded once and reused for every call.
+_sessions: dict = {}
+_sessions_lock = threading.Lock()
+
+
+def _ensure_std_streams() -> None:
+    """In no-console (PyInstaller) builds on Windows, sys.stdout/stderr can be None.
+
+    Some native libs write to them and crash with "NoneType has no attribute 'write'",
+    so they are redirected to os.devnull before rembg/onnxruntime are imported.
+    """
+    try:
+        import sys as _sys  # type: ignore
+        if getattr(_sys, "stdout", None) is None:
+            _sys.stdout = open(os.devnull, "w", encoding="utf-8", errors="ignore")  # type: ignore
+        if getattr(_sys, "stderr", None) is None:
+            _sys.stderr = open(os.devnull, "w", encoding="utf-8", errors="ignore")  # type: ignore
+    except Exception:
+        pass
+
+
+def _model_name(model_name: str | None = None) -> str:
+    return model_name or get_setting("rembg_model") or DEFAULT_MODEL
+
+
+def is_session_ready(model_name: str | None = None) -> bool:
+    """True if the session for model_name has already been created in this process."""
+    return _model_name(model_name) in _sessions
+
+
+def get_session(model_name: str | None = None):
+    """Shared rembg session for model_name, created (and the model loaded) on first use.
+
+    Concurrent first calls for the same model wait for a single load instead of
+    loading it twice. Raises RuntimeError if rembg is not installed.
+    """
+    name = _model_name(model_name)
+    session = _sessions.get(name)
+    if session is not None:
+        return session
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            _ensure_std_streams()
+            try:
+                from rembg import new_session  # type: ignore
+            except Exception:
+                raise RuntimeError("Missing 'rembg'. Install with: python -m pip install rembg")
+            session = _sessions[name] = new_session(name)
+        return session
+
+
+def model_file_present(model_name: str | None = None) -> bool:
+    """True if rembg's model file is already on disk, i.e. creating a session won't download it.
+
+    rembg keeps models in $U2NET_HOME, else $XDG_DATA_HOME/.u2net, else ~/.u2net,
+    named <model>.onnx.
+    """
+    home = os.getenv("U2NET_HOME") or os.path.join(os.getenv("XDG_DATA_HOME", "~"), ".u2net")
+    return os.path.isfile(os.path.join(os.path.expanduser(home), f"{_model_name(model_name)}.onnx"))
+
+
+def warm_up_session(model_name: str | None = None) -> threading.Thread | None:
+    """Load the rembg model in a background thread so the first removal starts immediately.
+
+    Does nothing (returns None) when rembg is not installed, the model has not
+    been downloaded yet (the first real removal downloads it, never the
+    warm-up), or the "rembg_warmup" setting is "0". Failures are ignored; the
+    model is then loaded on first use as before.
+    """
+    if get_setting("rembg_warmup") == "0" or not model_file_present(model_name):
+        return None
+    try:
+        import importlib.util as _importlib_util
+        if _importlib_util.find_spec("rembg") is None:
+            return None
+    except Exception:
+        return None
+
+    def _run():
+        try:
+            from rembg import remove  # type: ignore
+            session = get_session(model_name)
+            # One tiny inference finishes onnxruntime's lazy initialization too
+            remove(Image.new("RGBA", (64, 64), (255, 255, 255, 255)), session=session)
+        except Exception:
+            pass
+
+    t = threading.Thread(target=_run, name="rembg-warmup", daemon=True)
+    t.start()
+    return t
+
 
 def clean_mask(image: Image.Image) -> Image.Image:
     """Apply a median filter to remove small noise in the alpha/mask."""
@@ -46,8 +145,576 @@ def smooth_edges(pil_image: Image.Image) -> Image.Image:
     return Image.merge("RGBA", (r, g, b, a))
 
 
-def remove_background():  # noqa: C901 (complexity acceptable for GUI handler)
-    """Open file dialog, remove background with rembg (if installed), allow post-processing."""
+def _to_rgba(out) -> Image.Image:
+    """rembg.remove may return bytes (PNG), a PIL Image, or a numpy array.
+    Normalize to a PIL RGBA Image to avoid downstream crashes."""
+    img = None
+    if isinstance(out, bytes):
+        try:
+            from io import BytesIO
+            img = Image.open(BytesIO(out)).convert("RGBA")
+        except Exception as e:
+            raise RuntimeError(f"Failed to decode rembg bytes: {e}")
+    elif hasattr(out, 'mode') and hasattr(out, 'size'):
+        # Likely a PIL Image
+        try:
+            img = out.convert("RGBA")
+        except Exception:
+            img = out
+    else:
+        # Try numpy array path
+        try:
+            img = Image.fromarray(out).convert("RGBA")
+        except Exception as e:
+            raise RuntimeError(f"Unsupported rembg output type: {type(out)} ({e})")
+    if img is None:
+        raise RuntimeError(f"Unexpected rembg output type: {type(out)}")
+    return img
+
+
+def apply_post_processing(img: Image.Image, clean: bool = False, fill: bool = False, smooth: bool = False) -> Image.Image:
+    """Run the optional mask passes in the same order as the editing window's buttons."""
+    if clean:
+        img = clean_mask(img)
+    if fill:
+        img = fill_small_holes(img)
+    if smooth:
+        img = smooth_edges(img)
+    return img
+
+
+# --- Large images: infer on a proxy, upscale the mask ------------------------
+
+# The model predicts its mask at a fixed low resolution (320 px for u2net) and
+# rembg scales it back to the input size, so feeding it a 50 MP photo only adds
+# full-size resizes and tensor copies. Images whose longer side exceeds this are
+# inferred on a proxy of this size; "rembg_proxy_max_side" overrides it ("0" = off).
+PROXY_MAX_SIDE = 2048
+REFINE_STRIP_ROWS = 512  # full-resolution rows refined per step (bounds peak memory)
+
+
+def _proxy_max_side() -> int:
+    try:
+        return int(get_setting("rembg_proxy_max_side") or PROXY_MAX_SIDE)
+    except ValueError:
+        return PROXY_MAX_SIDE
+
+
+def _box_mean(a, r: int):
+    """Mean over a (2r+1)x(2r+1) window with edge clamping, via summed-area tables."""
+    import numpy as np  # type: ignore
+    h, w = a.shape
+    pad = np.pad(a, r + 1, mode="edge").astype(np.float64)
+    sat = pad.cumsum(0).cumsum(1)
+    k = 2 * r + 1
+    total = sat[k:k + h, k:k + w] - sat[0:h, k:k + w] - sat[k:k + h, 0:w] + sat[0:h, 0:w]
+    return (total / (k * k)).astype(np.float32)
+
+
+def refine_mask_upscale(mask: Image.Image, guide: Image.Image, size: tuple[int, int],
+                        radius: int = 8, eps: float = 1e-3) -> Image.Image:
+    """Upscale a low-resolution mask to size, snapping its edges to the full-size guide image.
+
+    Fast guided filter (He & Sun): the local linear model alpha = a * I + b is
+    fitted at the mask's resolution, then a and b are upsampled and applied to
+    the full-resolution grayscale guide in strips of rows, so only the
+    coefficients, never the filter itself, run at full size. Falls back to a
+    plain bilinear upscale when NumPy is unavailable.
+    """
+    try:
+        import numpy as np  # type: ignore
+    except Exception:
+        return mask.resize(size, Image.BILINEAR)
+    small = mask.size
+    gray = guide.convert("L")
+    I = np.asarray(gray.resize(small, Image.BILINEAR), dtype=np.float32) / 255.0
+    p = np.asarray(mask.convert("L"), dtype=np.float32) / 255.0
+    mean_I = _box_mean(I, radius)
+    mean_p = _box_mean(p, radius)
+    var_I = _box_mean(I * I, radius) - mean_I * mean_I
+    cov_Ip = _box_mean(I * p, radius) - mean_I * mean_p
+    a = cov_Ip / (var_I + eps)
+    b = mean_p - a * mean_I
+    coef_a = Image.fromarray(_box_mean(a, radius), mode="F")
+    coef_b = Image.fromarray(_box_mean(b, radius), mode="F")
+
+    W, H = size
+    sy = small[1] / float(H)
+    out = np.empty((H, W), dtype=np.uint8)
+    for y0 in range(0, H, REFINE_STRIP_ROWS):
+        y1 = min(H, y0 + REFINE_STRIP_ROWS)
+        box = (0, y0 * sy, small[0], y1 * sy)
+        A = np.asarray(coef_a.resize((W, y1 - y0), Image.BILINEAR, box=box))
+        B = np.asarray(coef_b.resize((W, y1 - y0), Image.BILINEAR, box=box))
+        q = np.asarray(gray.crop((0, y0, W, y1)), dtype=np.float32)
+        q *= A / 255.0
+        q += B
+        np.clip(q, 0.0, 1.0, out=q)
+        out[y0:y1] = (q * 255.0 + 0.5).astype(np.uint8)
+    return Image.fromarray(out, mode="L")
+
+
+def cutout(img: Image.Image, session, max_side: int | None = None, refine: bool | None = None) -> Image.Image:
+    """Remove the background from img with a rembg session; returns an RGBA image.
+
+    Images larger than max_side (default: PROXY_MAX_SIDE / "rembg_proxy_max_side")
+    are inferred on a downscaled proxy; only the predicted alpha mask is
+    upscaled, optionally with edge-aware refinement ("rembg_refine_edges",
+    on unless "0"), and applied to img at native size. img itself then becomes
+    the result (its alpha channel is replaced) to avoid another full-size copy.
+    """
+    from rembg import remove  # type: ignore
+
+    if max_side is None:
+        max_side = _proxy_max_side()
+    w, h = img.size
+    if max_side <= 0 or max(w, h) <= max_side:
+        return _to_rgba(remove(img, session=session))
+    if refine is None:
+        refine = get_setting("rembg_refine_edges") != "0"
+    scale = max_side / float(max(w, h))
+    proxy_size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    proxy = img.resize(proxy_size, Image.BILINEAR, reducing_gap=2.0).convert("RGB")
+    out = remove(proxy, session=session, only_mask=True)
+    if isinstance(out, bytes):
+        from io import BytesIO
+        out = Image.open(BytesIO(out))
+    elif not isinstance(out, Image.Image):
+        out = Image.fromarray(out)
+    mask = out.convert("L")
+    if refine:
+        mask = refine_mask_upscale(mask, img, (w, h), radius=max(2, max_side // 256))
+    else:
+        mask = mask.resize((w, h), Image.BILINEAR)
+    result = img if img.mode == "RGBA" else img.convert("RGBA")
+    result.putalpha(mask)
+    return result
+
+
+# --- Headless batch ---------------------------------------------------------
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.ico', '.webp', '.tif', '.tiff')
+BATCH_QUEUE_SIZE = 4      # decoded images / masks waiting between stages (bounds memory)
+BATCH_ENCODE_WORKERS = 2  # post-processing + PNG encoding threads
+
+
+def list_images(folder: str) -> list[str]:
+    """Image files directly inside folder, sorted by name."""
+    try:
+        names = sorted(os.listdir(folder), key=str.lower)
+    except OSError:
+        return []
+    return [os.path.join(folder, n) for n in names
+            if n.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(folder, n))]
+
+
+def remove_background_batch(jobs, clean: bool = False, fill: bool = False, smooth: bool = False,
+                            model_name: str | None = None, encode_workers: int = BATCH_ENCODE_WORKERS):
+    """Remove backgrounds from many images without any UI.
+
+    jobs is an iterable of (input_path, output_path). Three stages run
+    concurrently and hand work over through bounded queues: a loader decodes
+    images, one inference thread runs them through the shared rembg session,
+    and `encode_workers` threads apply the optional clean/fill/smooth passes
+    and write PNGs. Yields (input_path, output_path, success, message) as each
+    image finishes, in completion order; one failing image never stops the
+    batch. Raises RuntimeError up front if rembg is not installed.
+    """
+    import queue
+
+    jobs = list(jobs)
+    session = get_session(model_name)  # load the model before any thread starts
+
+    try:
+        Image.MAX_IMAGE_PIXELS = None
+        warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+    except Exception:
+        pass
+
+    encode_workers = max(1, int(encode_workers))
+    loaded: queue.Queue = queue.Queue(maxsize=BATCH_QUEUE_SIZE)
+    inferred: queue.Queue = queue.Queue(maxsize=BATCH_QUEUE_SIZE)
+    results: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def _put(q, item):
+        # Give up on a full queue once the consumer has gone away
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                continue
+
+    def _load():
+        for src, dst in jobs:
+            if stop.is_set():
+                break
+            try:
+                with Image.open(src) as im:
+                    img = im.convert("RGBA")
+                _put(loaded, (src, dst, img, None))
+            except Exception as e:
+                _put(loaded, (src, dst, None, f"Failed to open image: {e}"))
+        _put(loaded, done)
+
+    def _infer():
+        while True:
+            item = loaded.get()
+            if item is done or stop.is_set():
+                break
+            src, dst, img, err = item
+            if err is None:
+                try:
+                    img = cutout(img, session)
+                except Exception as e:
+                    img, err = None, f"Failed to remove background: {e}"
+            _put(inferred, (src, dst, img, err))
+        for _ in range(encode_workers):
+            _put(inferred, done)
+
+    def _encode():
+        while True:
+            item = inferred.get()
+            if item is done or stop.is_set():
+                break
+            src, dst, img, err = item
+            if err is None:
+                try:
+                    img = apply_post_processing(img, clean, fill, smooth)
+                    img.save(dst, format="PNG")
+                except Exception as e:
+                    err = f"Failed to save: {e}"
+            results.put((src, dst, err is None, err or "Saved"))
+
+    threads = [threading.Thread(target=_load, daemon=True), threading.Thread(target=_infer, daemon=True)]
+    threads += [threading.Thread(target=_encode, daemon=True) for _ in range(encode_workers)]
+    for t in threads:
+        t.start()
+    try:
+        for _ in range(len(jobs)):
+            yield results.get()
+    finally:
+        stop.set()
+
+
+# --- Manual eraser brush -----------------------------------------------------
+
+ERASER_UNDO_STEPS = 20
+
+
+class AlphaBrush:
+    """Eraser engine over a persistent NumPy RGBA buffer.
+
+    Each dab clears the alpha of a disk in place, touching only the brush's
+    bounding box, and every call returns the dirty rectangle (x0, y0, x1, y1)
+    so the caller can refresh just that part of the display. Undo keeps only
+    the alpha patch under each stroke instead of a copy of the whole image.
+    """
+
+    def __init__(self, image: Image.Image) -> None:
+        import numpy as np  # type: ignore
+        self._np = np
+        self.rgba = np.array(image.convert("RGBA"))  # writable copy, edited in place
+        self.alpha = self.rgba[:, :, 3]
+        self._before = None
+        self._stroke_box = None
+        self._last = None
+        self._undo: list = []
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.rgba.shape[1], self.rgba.shape[0]
+
+    def image(self) -> Image.Image:
+        """Independent PIL copy of the current buffer."""
+        return Image.fromarray(self.rgba.copy(), mode="RGBA")
+
+    def region(self, box) -> Image.Image:
+        x0, y0, x1, y1 = box
+        return Image.fromarray(self.rgba[y0:y1, x0:x1], mode="RGBA")
+
+    @staticmethod
+    def _union(a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+    def _dab(self, cx: int, cy: int, r: int):
+        h, w = self.alpha.shape
+        x0, x1 = max(0, cx - r), min(w, cx + r + 1)
+        y0, y1 = max(0, cy - r), min(h, cy + r + 1)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        yy, xx = self._np.ogrid[y0 - cy:y1 - cy, x0 - cx:x1 - cx]
+        self.alpha[y0:y1, x0:x1][xx * xx + yy * yy <= r * r] = 0
+        return x0, y0, x1, y1
+
+    def begin_stroke(self) -> None:
+        self._before = self.alpha.copy()
+        self._stroke_box = None
+        self._last = None
+
+    def erase_to(self, x: int, y: int, radius: int):
+        """Erase a disk at (x, y), filling the gap from the previous point of the stroke.
+
+        Returns the dirty rectangle, or None if nothing inside the image changed.
+        """
+        r = max(1, int(radius))
+        box = None
+        if self._last is None:
+            box = self._dab(x, y, r)
+        else:
+            lx, ly = self._last
+            steps = max(1, int(max(abs(x - lx), abs(y - ly)) / max(1.0, r / 2.0)))
+            for i in range(1, steps + 1):
+                box = self._union(box, self._dab(round(lx + (x - lx) * i / steps), round(ly + (y - ly) * i / steps), r))
+        self._last = (x, y)
+        self._stroke_box = self._union(self._stroke_box, box)
+        return box
+
+    def end_stroke(self) -> None:
+        box, before = self._stroke_box, self._before
+        self._before = self._stroke_box = self._last = None
+        if box is None or before is None:
+            return
+        x0, y0, x1, y1 = box
+        self._undo.append((box, before[y0:y1, x0:x1].copy()))
+        if len(self._undo) > ERASER_UNDO_STEPS:
+            self._undo.pop(0)
+
+    def undo(self):
+        """Restore the alpha under the last stroke; returns its rectangle or None."""
+        if self._before is not None:
+            self.end_stroke()
+        if not self._undo:
+            return None
+        box, patch = self._undo.pop()
+        x0, y0, x1, y1 = box
+        self.alpha[y0:y1, x0:x1] = patch
+        return box
+
+
+class ZoomPyramid:
+    """Half-resolution copies of an AlphaBrush buffer for viewport rendering.
+
+    render() crops the visible rectangle out of the smallest level that is
+    still at least as detailed as the zoom, then scales only that crop, so
+    pan and zoom cost follows the viewport size, not the image size. After
+    the brush changes pixels, update(box) rebuilds just that rectangle on
+    every level.
+    """
+
+    def __init__(self, brush: AlphaBrush, min_zoom: float = 1.0) -> None:
+        self.brush = brush
+        self.levels: list[Image.Image] = []  # levels[k] is 1/2**(k+1) scale; level 0 is the brush itself
+        w, h = brush.size
+        level = brush.region((0, 0, w, h))
+        while min(level.size) > 1 and 0.5 ** (len(self.levels) + 1) >= min_zoom:
+            level = level.reduce(2)
+            self.levels.append(level)
+
+    def _region(self, k: int, box) -> Image.Image:
+        return self.brush.region(box) if k == 0 else self.levels[k - 1].crop(box)
+
+    def _level_size(self, k: int) -> tuple[int, int]:
+        return self.brush.size if k == 0 else self.levels[k - 1].size
+
+    def update(self, box) -> None:
+        """Recompute the rectangle box (full-resolution coordinates) on every level."""
+        if box is None:
+            return
+        x0, y0, x1, y1 = box
+        for k in range(1, len(self.levels) + 1):
+            # Level k covers 2x2 blocks of level k-1; widen to whole blocks
+            x0, y0, x1, y1 = x0 // 2, y0 // 2, (x1 + 1) // 2, (y1 + 1) // 2
+            pw, ph = self._level_size(k - 1)
+            src = self._region(k - 1, (2 * x0, 2 * y0, min(2 * x1, pw), min(2 * y1, ph)))
+            self.levels[k - 1].paste(src.reduce(2), (x0, y0))
+
+    def render(self, rect, zoom: float, offset, resample=Image.LANCZOS) -> Image.Image:
+        """Pixels for the canvas rectangle rect of the image drawn at zoom with its
+        top-left corner at offset (canvas coordinates)."""
+        cx0, cy0, cx1, cy1 = rect
+        k = 0
+        while k < len(self.levels) and 0.5 ** (k + 1) >= zoom:
+            k += 1
+        w, h = self.brush.size
+        lw, lh = self._level_size(k)
+        sx, sy = lw / float(w), lh / float(h)
+        # Visible area in level coordinates
+        fx0 = max(0.0, (cx0 - offset[0]) / zoom * sx)
+        fy0 = max(0.0, (cy0 - offset[1]) / zoom * sy)
+        fx1 = min(float(lw), (cx1 - offset[0]) / zoom * sx)
+        fy1 = min(float(lh), (cy1 - offset[1]) / zoom * sy)
+        # Integer crop with a margin for the filter kernel, then scale only the crop
+        pad = int(3 * max(1.0, sx / zoom)) + 2
+        ix0, iy0 = max(0, int(fx0) - pad), max(0, int(fy0) - pad)
+        ix1, iy1 = min(lw, int(fx1) + pad + 1), min(lh, int(fy1) + pad + 1)
+        crop = self._region(k, (ix0, iy0, ix1, iy1))
+        return crop.resize((cx1 - cx0, cy1 - cy0), resample, box=(fx0 - ix0, fy0 - iy0, fx1 - ix0, fy1 - iy0))
+
+
+def _missing_dependencies(feature: str, input_path: str | None) -> list[str]:
+    """Pip names of missing AI libraries; shows a friendly dialog and logs when any are missing."""
+    # This avoids a long "Loading AI libraries…" phase on systems/executables where
+    # these libraries are not bundled (e.g., PyInstaller no-console builds).
+    try:
+        import importlib.util as _importlib_util  # type: ignore
+    except Exception:
+        return []  # Fallback: let runtime import errors occur in worker
+    missing = []
+    for mod_name, pip_name in (("rembg", "rembg"), ("numpy", "numpy"), ("cv2", "opencv-python-headless")):
+        try:
+            spec = _importlib_util.find_spec(mod_name)
+        except Exception:
+            spec = None
+        if spec is None:
+            missing.append(pip_name)
+    if missing:
+        # User-friendly message explaining why background removal isn't available here.
+        try:
+            messagebox.showerror(
+                "Background removal unavailable",
+                (
+                    "This feature needs extra AI libraries that aren't bundled in the portable build.\n\n"
+                    "Required packages:\n  - " + "\n  - ".join(missing) + "\n\n"
+                    "To use background removal, run DOTformat from source and install them:\n"
+                    "python -m pip install " + " ".join(missing)
+                )
+            )
+        except Exception:
+            pass
+        try:
+            ConversionService().log_error(feature, input_path, f"Missing dependencies: {', '.join(missing)}")
+        except Exception:
+            pass
+    return missing
+
+
+def _ask_mode():
+    """Single image (with the editing window) or a whole folder. Returns None if cancelled,
+    "single", or ("batch", clean, fill, smooth)."""
+    import tkinter as tk
+    from tkinter import ttk
+    win = Toplevel()
+    win.title("Remove Background")
+    win.geometry("300x250")
+    win.resizable(False, False)
+    win.grab_set()
+    mode = tk.StringVar(value="single")
+    ttk.Label(win, text="Choose what to process:").pack(pady=(10, 4))
+    ttk.Radiobutton(win, text="Single image (edit result)", variable=mode, value="single").pack(anchor="w", padx=20)
+    ttk.Radiobutton(win, text="Whole folder (batch)", variable=mode, value="batch").pack(anchor="w", padx=20)
+    ttk.Label(win, text="Automatic passes (batch):").pack(pady=(10, 2))
+    passes = {}
+    for key, text in (("clean", "Clean mask"), ("fill", "Fill small holes"), ("smooth", "Smooth edges")):
+        passes[key] = tk.BooleanVar(value=get_setting(f"rembg_batch_{key}") == "1")
+        ttk.Checkbutton(win, text=text, variable=passes[key]).pack(anchor="w", padx=30)
+    sel = {"val": None}
+
+    def confirm():
+        if mode.get() == "batch":
+            for key, var in passes.items():
+                set_setting(f"rembg_batch_{key}", "1" if var.get() else "0")
+            sel["val"] = ("batch", passes["clean"].get(), passes["fill"].get(), passes["smooth"].get())
+        else:
+            sel["val"] = "single"
+        win.destroy()
+
+    btns = ttk.Frame(win); btns.pack(pady=10)
+    ttk.Button(btns, text="Continue", command=confirm).pack(side="left", padx=6)
+    ttk.Button(btns, text="Cancel", command=win.destroy).pack(side="left", padx=6)
+    win.wait_window()
+    return sel["val"]
+
+
+def remove_background_batch_action(clean: bool = False, fill: bool = False, smooth: bool = False,
+                                   username: str | None = None):
+    """GUI flow for batch mode: pick folders, run remove_background_batch with a progress window."""
+    import tkinter as tk
+    from tkinter import ttk
+    input_dir = filedialog.askdirectory(title="Select the folder with images", initialdir=(get_setting("last_dir_image") or ""))
+    if not input_dir:
+        # User cancelled; do nothing.
+        return
+    set_setting("last_dir_image", input_dir)
+    output_dir = filedialog.askdirectory(title="Select the directory to save the images", initialdir=(get_setting("last_dir_image_nobg") or input_dir))
+    if not output_dir:
+        return
+    set_setting("last_dir_image_nobg", output_dir)
+    images = list_images(input_dir)
+    if not images:
+        messagebox.showwarning("Warning", "No images found in the folder.")
+        return
+    if _missing_dependencies("remove_background_batch", input_dir):
+        return
+    taken: set[str] = set()  # photo.jpg and photo.png must not both write photo_nobg.png
+    jobs = [(p, reserve_output_path(os.path.join(output_dir, f"{os.path.splitext(os.path.basename(p))[0]}_nobg.png"), taken, p))
+            for p in images]
+
+    prog = Toplevel()
+    prog.title("Removing backgrounds...")
+    prog.geometry("360x120")
+    prog.resizable(False, False)
+    prog.grab_set()
+    msg = tk.StringVar(value="Loading AI model…")
+    ttk.Label(prog, textvariable=msg).pack(pady=(10, 6))
+    pvar = tk.DoubleVar(value=0.0)
+    ttk.Progressbar(prog, mode='determinate', maximum=100, variable=pvar, length=300).pack(pady=6)
+    prog.protocol("WM_DELETE_WINDOW", lambda: None)
+    outcome = {"ok": 0, "errors": [], "fatal": None}
+
+    def _worker():
+        service = ConversionService()
+        try:
+            _ensure_std_streams()
+            for n, (src, dst, ok, detail) in enumerate(remove_background_batch(jobs, clean, fill, smooth), start=1):
+                try:
+                    if ok:
+                        outcome["ok"] += 1
+                        service.log_success("remove_background_batch", src, dst, username=username)
+                    else:
+                        outcome["errors"].append(f"{os.path.basename(src)}: {detail}")
+                        service.log_error("remove_background_batch", src, detail, username=username)
+                except Exception:
+                    pass
+                prog.after(0, lambda n=n: (pvar.set(n / len(jobs) * 100.0), msg.set(f"{n}/{len(jobs)} images done")))
+        except Exception as e:
+            outcome["fatal"] = e
+        finally:
+            try:
+                prog.after(100, prog.destroy)
+            except Exception:
+                pass
+
+    threading.Thread(target=_worker, daemon=True).start()
+    prog.wait_window()
+    if outcome["fatal"] is not None:
+        messagebox.showerror("Error", f"Failed to remove backgrounds: {outcome['fatal']}")
+        return
+    summary = f"Processed {outcome['ok']}/{len(jobs)} images into {output_dir}."
+    if outcome["errors"]:
+        summary += "\n\n" + "\n".join(outcome["errors"][:10])
+        messagebox.showwarning("Batch finished with errors", summary)
+    else:
+        messagebox.showinfo("Batch finished", summary)
+
+
+def remove_background(username: str | None = None):  # noqa: C901 (complexity acceptable for GUI handler)
+    """Open file dialog, remove background with rembg (if installed), allow post-processing.
+
+    Also offers a batch mode that processes a whole folder without the editing window.
+    """
+    mode = _ask_mode()
+    if mode is None:
+        return
+    if mode != "single":
+        _, clean, fill, smooth = mode
+        return remove_background_batch_action(clean, fill, smooth, username=username)
     filetypes = [
         ("Images", "*.png;*.jpg;*.jpeg;*.bmp;*.gif;*.ico"),
         ("All Files", "*.*")
@@ -72,41 +739,9 @@ def remove_background():  # noqa: C901 (complexity acceptable for GUI handler)
     default_output = os.path.join(desktop, f"{base}_nobg.png")
 
     # Quick preflight: check for heavy dependencies before opening any progress UI
-    # This avoids a long "Loading AI libraries…" phase on systems/executables where
-    # these libraries are not bundled (e.g., PyInstaller no-console builds).
-    try:
-        import importlib.util as _importlib_util  # type: ignore
-    except Exception:
-        _importlib_util = None  # Fallback: let runtime import errors occur in worker
-
-    if _importlib_util is not None:
-        missing = []
-        for mod_name, pip_name in (("rembg", "rembg"), ("numpy", "numpy"), ("cv2", "opencv-python-headless")):
-            try:
-                spec = _importlib_util.find_spec(mod_name)
-            except Exception:
-                spec = None
-            if spec is None:
-                missing.append(pip_name)
-        if missing:
-            # User-friendly message explaining why background removal isn't available here.
-            try:
-                messagebox.showerror(
-                    "Background removal unavailable",
-                    (
-                        "This feature needs extra AI libraries that aren't bundled in the portable build.\n\n"
-                        "Required packages:\n  - " + "\n  - ".join(missing) + "\n\n"
-                        "To use background removal, run DOTformat from source and install them:\n"
-                        "python -m pip install " + " ".join(missing)
-                    )
-                )
-            except Exception:
-                pass
-            try:
-                ConversionService().log_error("remove_background", input_path, f"Missing dependencies: {', '.join(missing)}")
-            except Exception:
-                pass
-            return "Error, Missing dependencies", f"Missing dependencies: {', '.join(missing)}"
+    missing = _missing_dependencies("remove_background", input_path)
+    if missing:
+        return "Error, Missing dependencies", f"Missing dependencies: {', '.join(missing)}"
 
     # Configure Pillow safety for large images (avoid warnings/stops before progress UI)
     try:
@@ -164,69 +799,31 @@ def remove_background():  # noqa: C901 (complexity acceptable for GUI handler)
 
     def _worker():
         try:
-            # In no-console (PyInstaller) builds on Windows, sys.stdout/stderr can be None.
-            # Some native libs write to them and crash with "NoneType has no attribute 'write'".
-            # Redirect to os.devnull to avoid crashes while keeping UI responsive.
-            try:
-                import sys as _sys, os as _os, io as _io  # type: ignore
-                if getattr(_sys, "stdout", None) is None:
-                    _sys.stdout = open(_os.devnull, "w", encoding="utf-8", errors="ignore")  # type: ignore
-                if getattr(_sys, "stderr", None) is None:
-                    _sys.stderr = open(_os.devnull, "w", encoding="utf-8", errors="ignore")  # type: ignore
-            except Exception:
-                pass
+            _ensure_std_streams()
 
             _set_msg("Loading AI libraries…")
             _set_progress(5)
-            try:
-                from rembg import remove  # type: ignore
-            except Exception:
-                raise RuntimeError("Missing 'rembg'. Install with: python -m pip install rembg")
-            try:
-                import numpy as np  # type: ignore
-            except Exception:
-                raise RuntimeError("Missing 'numpy'. Install with: python -m pip install numpy")
-            try:
-                import cv2  # type: ignore
-            except Exception:
-                raise RuntimeError("Missing 'opencv-python-headless'. Install with: python -m pip install opencv-python-headless")
+            # Import the heavy libraries now (this is the slow part) so a missing one fails early;
+            # cutout() and the post-processing passes use them afterwards
+            import importlib
+            for mod_name, pip_name in (("rembg", "rembg"), ("numpy", "numpy"), ("cv2", "opencv-python-headless")):
+                try:
+                    importlib.import_module(mod_name)
+                except Exception:
+                    raise RuntimeError(f"Missing '{pip_name}'. Install with: python -m pip install {pip_name}")
 
             _set_msg("Loading image…")
             _set_progress(10)
             input_image = Image.open(input_path).convert("RGBA")
 
+            if not is_session_ready():
+                _set_msg("Loading AI model…")
+                _set_progress(20)
+            session = get_session()
+
             _set_msg("Applying AI model…")
             _set_progress(35)
-            out = remove(input_image)
-
-            # rembg.remove may return bytes (PNG), a PIL Image, or a numpy array.
-            # Normalize to a PIL RGBA Image to avoid downstream crashes.
-            img = None
-            try:
-                from io import BytesIO
-                import numpy as _np  # type: ignore
-            except Exception:
-                _np = None
-            if isinstance(out, bytes):
-                try:
-                    img = Image.open(BytesIO(out)).convert("RGBA")
-                except Exception as e:
-                    raise RuntimeError(f"Failed to decode rembg bytes: {e}")
-            elif hasattr(out, 'mode') and hasattr(out, 'size'):
-                # Likely a PIL Image
-                try:
-                    img = out.convert("RGBA")
-                except Exception:
-                    img = out
-            else:
-                # Try numpy array path
-                try:
-                    if _np is not None:
-                        img = Image.fromarray(out).convert("RGBA")
-                except Exception as e:
-                    raise RuntimeError(f"Unsupported rembg output type: {type(out)} ({e})")
-            if img is None:
-                raise RuntimeError(f"Unexpected rembg output type: {type(out)}")
+            img = cutout(input_image, session)
 
             _set_msg("Finalizing…")
             _set_progress(95)
@@ -319,47 +916,83 @@ def remove_background():  # noqa: C901 (complexity acceptable for GUI handler)
         manual_win.configure(bg="#1C1C1C")
         manual_win.grab_set()
 
-        # Variables for zoom, brush, pan offset, and undo stack
-        zoom_factor = [1.0]  # Mutable for nested functions
+        # Variables for zoom, brush, pan offset
+        view_size = 600      # Canvas width/height
         brush_radius = [10]
-        offset = [0, 0]      # Pan offset (x, y)
         drag_start = [0, 0]  # Mouse position at start of drag
-        undo_stack_manual = []
+        visible = [None]     # Canvas rectangle currently covered by the displayed photo
+        hq_job = [None]      # Pending high-quality redraw after interaction
 
-        # Copy the current image for editing
-        edited_image = output_image.copy()
+        # Persistent RGBA buffer for editing (also keeps the undo history)
+        try:
+            brush = AlphaBrush(output_image)
+        except Exception:
+            manual_win.destroy()
+            messagebox.showerror("Error", "Manual eraser needs 'numpy'. Install with: python -m pip install numpy", parent=win)
+            return
+        # Start fitted to the canvas; zooming out below 1.0 is allowed down to that fit
+        img_w, img_h = brush.size
+        min_zoom = min(1.0, view_size / float(img_w), view_size / float(img_h))
+        zoom_factor = [min_zoom]  # Mutable for nested functions
+        offset = [int((view_size - img_w * min_zoom) / 2), int((view_size - img_h * min_zoom) / 2)]  # Pan offset (x, y)
+        pyramid = ZoomPyramid(brush, min_zoom)
 
         # Canvas for editing
         canvas_manual = Canvas(manual_win, width=600, height=600, bg="#1C1C1C", highlightthickness=0)
         canvas_manual.grid(row=0, column=1, rowspan=6, padx=10, pady=10)
 
-        def update_canvas_image_manual():
+        def update_canvas_image_manual(fast=False):
             """
-            Draws the image on the canvas at the current zoom level and offset.
+            Draws the visible part of the image at the current zoom level and offset.
+            With fast=True (while zooming/panning) a cheap filter is used and a
+            high-quality redraw is scheduled for when the interaction stops.
             """
-            img_disp = edited_image.copy()
-            w, h = img_disp.size
-            new_size = (int(w * zoom_factor[0]), int(h * zoom_factor[0]))
-            img_disp = img_disp.resize(new_size, Image.LANCZOS)
+            z = zoom_factor[0]
+            rect = (max(0, offset[0]), max(0, offset[1]),
+                    min(view_size, int(offset[0] + img_w * z)), min(view_size, int(offset[1] + img_h * z)))
+            canvas_manual.delete("all")
+            if rect[0] >= rect[2] or rect[1] >= rect[3]:
+                visible[0] = None
+                canvas_manual.image = None
+                return
+            img_disp = pyramid.render(rect, z, offset, Image.BILINEAR if fast else Image.LANCZOS)
             tk_img = ImageTk.PhotoImage(img_disp)
             canvas_manual.image = tk_img
-            canvas_manual.delete("all")
-            # Draw image at current offset
-            canvas_manual.create_image(offset[0], offset[1], anchor="nw", image=tk_img)
+            visible[0] = rect
+            canvas_manual.create_image(rect[0], rect[1], anchor="nw", image=tk_img)
+            if hq_job[0] is not None:
+                canvas_manual.after_cancel(hq_job[0])
+                hq_job[0] = None
+            if fast:
+                hq_job[0] = canvas_manual.after(150, lambda: (hq_job.__setitem__(0, None), update_canvas_image_manual()))
+
+        def refresh_region_manual(box):
+            """
+            Re-renders only the displayed pixels covering the image rectangle box and
+            copies them into the shown photo, instead of redrawing the whole view.
+            """
+            if box is None:
+                return
+            pyramid.update(box)
+            rect = visible[0]
+            if rect is None or getattr(canvas_manual, "image", None) is None:
+                return
+            z = zoom_factor[0]
+            cx0 = max(rect[0], int(offset[0] + box[0] * z))
+            cy0 = max(rect[1], int(offset[1] + box[1] * z))
+            cx1 = min(rect[2], int(offset[0] + box[2] * z) + 2)
+            cy1 = min(rect[3], int(offset[1] + box[3] * z) + 2)
+            if cx0 >= cx1 or cy0 >= cy1:
+                return
+            patch_tk = ImageTk.PhotoImage(pyramid.render((cx0, cy0, cx1, cy1), z, offset))
+            canvas_manual.tk.call(str(canvas_manual.image), "copy", str(patch_tk),
+                                  "-to", cx0 - rect[0], cy0 - rect[1], "-compositingrule", "set")
 
         def on_brush_size_change(val):
             brush_radius[0] = int(val)
 
-        def save_state_manual():
-            undo_stack_manual.append(edited_image.copy())
-            if len(undo_stack_manual) > 20:
-                undo_stack_manual.pop(0)
-
         def undo_action_manual():
-            nonlocal edited_image
-            if undo_stack_manual:
-                edited_image = undo_stack_manual.pop()
-                update_canvas_image_manual()
+            refresh_region_manual(brush.undo())
 
         def canvas_to_image_coords_manual(x, y):
             """
@@ -373,25 +1006,15 @@ def remove_background():  # noqa: C901 (complexity acceptable for GUI handler)
             """
             Erases (makes transparent) a circular area under the cursor.
             """
-            nonlocal edited_image
-            # Ensure heavy deps available when using manual eraser
-            try:
-                import numpy as np  # type: ignore
-                import cv2  # type: ignore
-            except Exception:
-                return
             img_x, img_y = canvas_to_image_coords_manual(event.x, event.y)
-            img_np = np.array(edited_image)
-            if img_np.shape[2] == 4:
-                alpha = img_np[:, :, 3].copy()
-                cv2.circle(alpha, (img_x, img_y), brush_radius[0], 0, -1)
-                img_np[:, :, 3] = alpha
-                edited_image = Image.fromarray(img_np)
-                update_canvas_image_manual()
+            # The brush size is in screen pixels, matching the red preview at any zoom
+            radius = max(1, round(brush_radius[0] / zoom_factor[0]))
+            refresh_region_manual(brush.erase_to(img_x, img_y, radius))
 
         def show_eraser_manual(event):
             """
-            Draws the brush preview (red circle) at the cursor position, considering zoom and offset.
+            Draws the brush preview (red circle) at the cursor position; its on-screen size is
+            exactly the area paint_manual erases at the current zoom.
             """
             canvas_manual.delete("eraser_preview")
             x, y = event.x, event.y
@@ -406,13 +1029,13 @@ def remove_background():  # noqa: C901 (complexity acceptable for GUI handler)
             old_zoom = zoom_factor[0]
             if event.delta > 0 and zoom_factor[0] < 5.0:
                 zoom_factor[0] *= 1.1
-            elif event.delta < 0 and zoom_factor[0] > 1.0:
-                zoom_factor[0] /= 1.1
+            elif event.delta < 0 and zoom_factor[0] > min_zoom:
+                zoom_factor[0] = max(min_zoom, zoom_factor[0] / 1.1)
             # Adjust offset so the point under the cursor stays under the cursor
             scale = zoom_factor[0] / old_zoom
             offset[0] = int(mouse_x - scale * (mouse_x - offset[0]))
             offset[1] = int(mouse_y - scale * (mouse_y - offset[1]))
-            update_canvas_image_manual()
+            update_canvas_image_manual(fast=True)
 
         # --- Dragging with right mouse button ---
         def start_drag(event):
@@ -422,7 +1045,7 @@ def remove_background():  # noqa: C901 (complexity acceptable for GUI handler)
         def drag(event):
             offset[0] = event.x - drag_start[0]
             offset[1] = event.y - drag_start[1]
-            update_canvas_image_manual()
+            update_canvas_image_manual(fast=True)
 
         def exit_manual_eraser():
             # Ask user if wants to save changes
@@ -436,7 +1059,7 @@ def remove_background():  # noqa: C901 (complexity acceptable for GUI handler)
             elif result:
                 # Save changes to main image
                 nonlocal output_image
-                output_image = edited_image.copy()
+                output_image = brush.image()
                 update_canvas_image(output_image)
                 manual_win.destroy()
             else:
@@ -476,11 +1099,15 @@ def remove_background():  # noqa: C901 (complexity acceptable for GUI handler)
         
         # Canvas bindings
         def start_draw_manual(event):
-            save_state_manual()
+            brush.begin_stroke()
             paint_manual(event)
 
+        def end_draw_manual(event):
+            brush.end_stroke()
+
         canvas_manual.bind("<B1-Motion>", paint_manual)
         canvas_manual.bind("<ButtonPress-1>", start_draw_manual)
+        canvas_manual.bind("<ButtonRelease-1>", end_draw_manual)
         canvas_manual.bind("<Motion>", show_eraser_manual)
         canvas_manual.bind("<MouseWheel>", on_mouse_wheel)
         canvas_manual.bind("<ButtonPress-3>", start_drag)
@@ -0,0 +1,204 @@
+"""Speech recognition backends for audio transcription.
+
+Every backend turns one chunk of 16 kHz mono 16-bit PCM into (text, confidence),
+so the transcription pipeline does not care which engine does the work. The
+engine is chosen with the ``stt_backend`` user setting:
+
+  - ``google``: Google Web Speech API through SpeechRecognition (default, online).
+  - ``vosk``:   offline Vosk/Kaldi models; needs the optional ``vosk`` package
+                and an unpacked model folder.
+  - ``fake``:   deterministic output with optional latency, for benchmarks.
+
+Backends are created on first use and engine libraries are imported only then,
+so an unused engine costs nothing at startup.
+"""
+from __future__ import annotations
+from typing import Optional
+import hashlib
+import json
+import os
+import threading
+import time
+
+import speech_recognition as sr
+
+from src.utils.app_paths import get_base_data_dir
+from src.utils.user_settings import get_setting
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+DEFAULT_BACKEND = "google"
+
+
+class BackendUnavailable(RuntimeError):
+    """The selected engine cannot run here (missing package or model)."""
+
+
+class RecognizerBackend:
+    """Interface: recognize(pcm, language) -> (text, confidence).
+
+    Return ("", None) when nothing intelligible was heard. Raise
+    sr.RequestError for transient failures worth retrying and
+    BackendUnavailable when the engine cannot be used at all. Implementations
+    must be safe to call from several threads at once.
+    """
+
+    name = ""
+    label = ""
+    user_selectable = True  # offered in the GUI engine list
+
+    def prepare(self, language: str) -> None:
+        """Load whatever the language needs before the first chunk (optional)."""
+
+    def recognize(self, pcm: bytes, language: str) -> tuple[str, Optional[float]]:
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognizerBackend):
+    name = "google"
+    label = "Google (online)"
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def recognize(self, pcm: bytes, language: str) -> tuple[str, Optional[float]]:
+        # One Recognizer per thread so concurrent chunks never share state
+        recognizer = getattr(self._local, "recognizer", None)
+        if recognizer is None:
+            recognizer = self._local.recognizer = sr.Recognizer()
+        audio_data = sr.AudioData(pcm, SAMPLE_RATE, SAMPLE_WIDTH)
+        try:
+            result = recognizer.recognize_google(audio_data, language=language, show_all=True)
+        except sr.UnknownValueError:
+            return "", None
+        alternatives = result.get("alternative") if isinstance(result, dict) else None
+        if not alternatives:
+            return "", None
+        best = alternatives[0]
+        return best.get("transcript", ""), best.get("confidence")
+
+
+class VoskBackend(RecognizerBackend):
+    """Offline recognition with Vosk.
+
+    The model folder comes from the ``stt_vosk_model`` setting, or
+    <data dir>/models/vosk/<language> (e.g. pt-BR), or
+    <data dir>/models/vosk/<primary tag> (e.g. pt).
+    """
+
+    name = "vosk"
+    label = "Vosk (offline)"
+
+    def __init__(self) -> None:
+        self._models: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _model_dir(language: str) -> Optional[str]:
+        configured = get_setting("stt_vosk_model")
+        if configured and os.path.isdir(configured):
+            return configured
+        try:
+            root = get_base_data_dir() / "models" / "vosk"
+        except Exception:
+            return None
+        for candidate in (language, language.split("-")[0]):
+            path = root / candidate
+            if path.is_dir():
+                return str(path)
+        return None
+
+    def _model(self, language: str):
+        with self._lock:
+            model = self._models.get(language)
+            if model is not None:
+                return model
+            try:
+                import vosk  # type: ignore
+            except Exception:
+                raise BackendUnavailable(
+                    "Offline transcription needs the 'vosk' package (pip install vosk)."
+                )
+            path = self._model_dir(language)
+            if not path:
+                raise BackendUnavailable(
+                    f"No Vosk model found for '{language}'. Download one from "
+                    "https://alphacephei.com/vosk/models and unpack it into "
+                    f"{get_base_data_dir() / 'models' / 'vosk' / language}."
+                )
+            try:
+                vosk.SetLogLevel(-1)
+            except Exception:
+                pass
+            model = self._models[language] = vosk.Model(path)
+            return model
+
+    def prepare(self, language: str) -> None:
+        self._model(language)
+
+    def recognize(self, pcm: bytes, language: str) -> tuple[str, Optional[float]]:
+        import vosk  # type: ignore  # already imported by prepare()
+
+        # The model is shared; recognizers are cheap and not thread-safe, so one per chunk
+        rec = vosk.KaldiRecognizer(self._model(language), SAMPLE_RATE)
+        rec.SetWords(True)
+        rec.AcceptWaveform(pcm)
+        result = json.loads(rec.FinalResult() or "{}")
+        text = (result.get("text") or "").strip()
+        words = result.get("result") or []
+        confidence = sum(w.get("conf", 0.0) for w in words) / len(words) if words else None
+        return text, confidence
+
+
+class FakeBackend(RecognizerBackend):
+    """Deterministic stand-in: text derived from the chunk bytes, optional fixed latency."""
+
+    name = "fake"
+    label = "Fake (benchmark)"
+    user_selectable = False
+
+    def __init__(self, latency_s: float = 0.0) -> None:
+        self.latency_s = latency_s
+
+    def recognize(self, pcm: bytes, language: str) -> tuple[str, Optional[float]]:
+        if self.latency_s > 0:
+            time.sleep(self.latency_s)
+        digest = hashlib.sha1(pcm).hexdigest()[:8]
+        seconds = len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+        return f"[{language} {seconds:.1f}s {digest}]", 1.0
+
+
+# name -> backend class; instances are created lazily by get_backend()
+BACKENDS: dict[str, type[RecognizerBackend]] = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+_instances: dict[str, RecognizerBackend] = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name: Optional[str] = None) -> RecognizerBackend:
+    """Backend by name, or the one chosen in the ``stt_backend`` setting (default: google)."""
+    if not name:
+        name = get_setting("stt_backend") or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        name = DEFAULT_BACKEND
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            backend = _instances[name] = BACKENDS[name]()
+        return backend
+
+
+__all__ = [
+    "RecognizerBackend",
+    "BackendUnavailable",
+    "GoogleBackend",
+    "VoskBackend",
+    "FakeBackend",
+    "BACKENDS",
+    "DEFAULT_BACKEND",
+    "get_backend",
+]
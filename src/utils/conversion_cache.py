@@ -0,0 +1,168 @@
+"""On-disk, content-addressed cache of conversion results.
+
+Entries live under <data dir>/cache/<namespace>/ and are keyed by the SHA-256
+of the input bytes plus the conversion parameters, so re-running an identical
+conversion becomes a file copy (or hardlink) instead of a decode/encode.
+
+Recency is tracked through each entry's mtime (touched on every hit); trim()
+evicts least-recently-used entries until the cache fits its size cap. Writes
+go through a temp file + os.replace, so several worker processes can share
+one cache directory safely. Cache failures never fail a conversion: lookups
+simply miss and stores are skipped.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional
+import hashlib
+import os
+import shutil
+import tempfile
+
+from .app_paths import get_base_data_dir
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB
+# trim_margin() evicts down to this fraction of the cap, so a long batch trims every ~10% of the cap, not every store
+TRIM_LOW_WATERMARK = 0.9
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file's contents, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ConversionCache:
+    def __init__(self, namespace: str, max_bytes: int = DEFAULT_MAX_BYTES, hardlink: bool = False) -> None:
+        # Copies are the default: a hardlinked output edited in place would silently corrupt the cache entry
+        self.max_bytes = max_bytes
+        self.hardlink = hardlink
+        self.hits = 0
+        self.misses = 0
+        try:
+            self.root: Optional[Path] = get_base_data_dir() / "cache" / namespace
+            self.root.mkdir(parents=True, exist_ok=True)
+        except Exception:
+            self.root = None
+
+    def make_key(self, input_path: str, *params: object) -> Optional[str]:
+        """Key for input_path converted with params; None if the input can't be read."""
+        try:
+            h = hashlib.sha256(file_digest(input_path).encode("ascii"))
+        except Exception:
+            return None
+        for p in params:
+            h.update(b"\0" + str(p).encode("utf-8"))
+        return h.hexdigest()
+
+    def _entry(self, key: str, ext: str) -> Optional[Path]:
+        if self.root is None:
+            return None
+        return self.root / f"{key}.{ext.lstrip('.')}"
+
+    def fetch(self, key: Optional[str], ext: str, dest: str) -> bool:
+        """Materialize a cached result at dest. Returns True on hit."""
+        entry = self._entry(key, ext) if key else None
+        if entry is None or not entry.exists():
+            self.misses += 1
+            return False
+        try:
+            if os.path.exists(dest):
+                os.remove(dest)
+            if self.hardlink:
+                try:
+                    os.link(entry, dest)
+                except OSError:
+                    shutil.copyfile(entry, dest)
+            else:
+                shutil.copyfile(entry, dest)
+            os.utime(entry, None)  # mark as recently used
+        except Exception:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def storable(self, size: int) -> bool:
+        """Whether store() keeps an output of size bytes."""
+        # Entries bigger than a quarter of the cap would just evict everything else
+        return size <= self.max_bytes // 4
+
+    def store(self, key: Optional[str], ext: str, src: str) -> None:
+        """Add a freshly produced output to the cache (best effort)."""
+        entry = self._entry(key, ext) if key else None
+        if entry is None:
+            return
+        try:
+            if not self.storable(os.path.getsize(src)):
+                return
+            fd, tmp = tempfile.mkstemp(dir=str(self.root), suffix=".tmp")
+            os.close(fd)
+            try:
+                shutil.copyfile(src, tmp)
+                os.replace(tmp, entry)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        except Exception:
+            pass
+
+    def _scan(self) -> tuple[list, int]:
+        entries = []
+        total = 0
+        for p in self.root.iterdir():
+            if not p.is_file() or p.suffix == ".tmp":
+                continue
+            st = p.stat()
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        return entries, total
+
+    def usage_bytes(self) -> int:
+        """Current size of all entries (0 if the cache is unavailable)."""
+        if self.root is None:
+            return 0
+        try:
+            return self._scan()[1]
+        except Exception:
+            return 0
+
+    def trim(self, target_bytes: Optional[int] = None) -> int:
+        """Evict least-recently-used entries until the cache fits target_bytes
+        (default max_bytes). Returns entries removed."""
+        if self.root is None:
+            return 0
+        try:
+            entries, total = self._scan()
+        except Exception:
+            return 0
+        limit = self.max_bytes if target_bytes is None else target_bytes
+        removed = 0
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= limit:
+                break
+            try:
+                p.unlink()
+                total -= size
+                removed += 1
+            except Exception:
+                pass
+        return removed
+
+    def trim_margin(self) -> int:
+        """Trim to TRIM_LOW_WATERMARK of the cap; returns the size the cache is now at most."""
+        target = int(self.max_bytes * TRIM_LOW_WATERMARK)
+        self.trim(target)
+        return target
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+__all__ = ["ConversionCache", "file_digest", "DEFAULT_MAX_BYTES", "TRIM_LOW_WATERMARK"]
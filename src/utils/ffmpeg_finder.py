@@ -2,6 +2,7 @@ import os
 import sys
 import zipfile
 import tempfile
+import threading
 from pathlib import Path
 from shutil import which
 from typing import Optional, Tuple
@@ -80,8 +81,21 @@ def find_ffmpeg_paths() -> Tuple[Optional[Path], Optional[Path]]:
     return ffmpeg, ffprobe
 
 
+def no_window_popen_kwargs() -> dict:
+    """Popen kwargs that keep ffmpeg/ffprobe from flashing a console window on Windows."""
+    if os.name != "nt":
+        return {}
+    import subprocess
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    return {"startupinfo": startupinfo, "creationflags": getattr(subprocess, "CREATE_NO_WINDOW", 0)}
+
+
 def _prepend_to_process_path(bin_dir: Path) -> None:
-    os.environ["PATH"] = str(bin_dir) + os.pathsep + os.environ.get("PATH", "")
+    current = os.environ.get("PATH", "")
+    if str(bin_dir) in current.split(os.pathsep):
+        return
+    os.environ["PATH"] = str(bin_dir) + os.pathsep + current
 
 
 def _download_and_extract_ffmpeg(target_bin: Path) -> bool:
@@ -216,7 +230,30 @@ def ensure_ffmpeg(allow_download: bool = True) -> Tuple[Optional[Path], Optional
             _prepend_to_process_path(exe.parent)
     return ffmpeg, ffprobe
 
+_resolved: dict[str, str] = {}
+_resolve_lock = threading.Lock()
+
+
+def resolve_ffmpeg(allow_download: bool = True) -> Tuple[str, str]:
+    """(ffmpeg, ffprobe) executables, found once per process and then cached.
+
+    Call it on the Tk main thread before starting worker threads: only there
+    may it show the download prompt. Off the main thread it never prompts,
+    and if nothing was found yet it falls back to the bare names
+    ("ffmpeg"/"ffprobe"), which fail gracefully when run.
+    """
+    with _resolve_lock:
+        if not _resolved:
+            on_main = threading.current_thread() is threading.main_thread()
+            ffmpeg, ffprobe = ensure_ffmpeg(allow_download=allow_download and on_main)
+            if ffmpeg and ffprobe and ffmpeg.exists() and ffprobe.exists():
+                _resolved["ffmpeg"], _resolved["ffprobe"] = str(ffmpeg), str(ffprobe)
+        return _resolved.get("ffmpeg", "ffmpeg"), _resolved.get("ffprobe", "ffprobe")
+
+
 __all__ = [
     "find_ffmpeg_paths",
     "ensure_ffmpeg",
+    "resolve_ffmpeg",
+    "no_window_popen_kwargs",
 ]
@@ -0,0 +1,37 @@
+"""Unique output names for batch jobs.
+
+Batch outputs are named after the source file's base name, so inputs that
+differ only by extension (photo.png, photo.bmp) would map to the same output
+and, with concurrent workers, be written at the same time. reserve_output_path
+hands out each path once per batch: the first claimant keeps the plain name,
+later ones get the source extension and, if still taken, a counter.
+"""
+from __future__ import annotations
+from typing import Optional
+import os
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def reserve_output_path(path: str, taken: set[str], source: Optional[str] = None) -> str:
+    """path, or a variant of it not yet in taken; the returned path is added to taken."""
+    if _key(path) not in taken:
+        taken.add(_key(path))
+        return path
+    stem, ext = os.path.splitext(path)
+    if source:
+        src_ext = os.path.splitext(source)[1].lstrip(".").lower()
+        if src_ext:
+            stem = f"{stem}_{src_ext}"
+    candidate = f"{stem}{ext}"
+    n = 2
+    while _key(candidate) in taken:
+        candidate = f"{stem}_{n}{ext}"
+        n += 1
+    taken.add(_key(candidate))
+    return candidate
+
+
+__all__ = ["reserve_output_path"]
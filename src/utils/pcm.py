@@ -0,0 +1,235 @@
+"""Vectorized PCM helpers for the transcription pipeline.
+
+The recognizer wants 16 kHz mono 16-bit PCM at a steady loudness. These helpers
+work on raw byte buffers with NumPy: per-frame RMS for silence detection, gain
+normalization computed and applied in one pass, and downmix + resampling of
+native-rate WAV data so such files need no ffmpeg process at all.
+
+NumPy is optional (it ships with the heavy background-removal stack); without it
+every helper falls back to the audioop/pydub equivalent with the same results.
+
+Run ``python -m src.utils.pcm`` to benchmark the NumPy stage against the pydub
+chain it replaces (apply_gain -> set_frame_rate -> set_channels -> set_sample_width).
+"""
+from __future__ import annotations
+from typing import Iterator, Optional
+import math
+import time
+import wave
+
+from pydub.utils import audioop  # stdlib audioop, or pydub's pure-Python fallback
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
+TARGET_RATE = 16000
+TARGET_WIDTH = 2
+_FULL_SCALE = 32768.0
+
+
+def frame_rms(pcm: bytes, frame_bytes: int) -> list[int]:
+    """RMS of each complete frame of 16-bit mono PCM (trailing partial frame ignored)."""
+    count = len(pcm) // frame_bytes
+    if count == 0:
+        return []
+    if np is None:
+        return [audioop.rms(pcm[i * frame_bytes:(i + 1) * frame_bytes], 2) for i in range(count)]
+    samples = np.frombuffer(pcm, dtype='<i2', count=count * frame_bytes // 2).reshape(count, -1)
+    energy = np.einsum('ij,ij->i', samples, samples, dtype=np.float64)  # sum of squares, no temporaries
+    return np.sqrt(energy / samples.shape[1]).astype(np.int64).tolist()
+
+
+def normalize_gain(pcm: bytes, target_dbfs: float = -20.0, silence_dbfs: float = -60.0) -> bytes:
+    """Scale 16-bit mono PCM so its RMS sits at target_dbfs; near-silent input is returned as-is."""
+    if not pcm:
+        return pcm
+    if np is None:
+        from pydub import AudioSegment
+        seg = AudioSegment(data=pcm, sample_width=2, frame_rate=TARGET_RATE, channels=1)
+        level = seg.dBFS
+        if level == float('-inf') or level < silence_dbfs:
+            return pcm
+        return seg.apply_gain(target_dbfs - level).raw_data
+    samples = np.frombuffer(pcm, dtype='<i2', count=len(pcm) // 2)
+    rms = math.sqrt(float(np.dot(samples, samples.astype(np.float64))) / len(samples))
+    if rms <= 0 or 20 * math.log10(rms / _FULL_SCALE) < silence_dbfs:
+        return pcm
+    factor = np.float32((10 ** (target_dbfs / 20.0) * _FULL_SCALE) / rms)
+    out = samples.astype(np.float32)
+    out *= factor
+    np.clip(out, -32768, 32767, out=out)
+    return out.astype('<i2').tobytes()
+
+
+def _to_float_mono(raw: bytes, sample_width: int, channels: int):
+    """Decode interleaved little-endian PCM into one float32 mono array (16-bit scale)."""
+    if sample_width == 1:
+        data = np.frombuffer(raw, dtype=np.uint8).astype(np.float32)
+        data -= 128.0
+        data *= 256.0
+    elif sample_width == 2:
+        data = np.frombuffer(raw, dtype='<i2').astype(np.float32)
+    else:  # 4
+        data = np.frombuffer(raw, dtype='<i4').astype(np.float32)
+        data *= 1.0 / 65536.0
+    if channels > 1:
+        # Strided adds are several times faster than reshape().mean(axis=1)
+        usable = len(data) - len(data) % channels
+        mono = data[0:usable:channels].copy()
+        for ch in range(1, channels):
+            mono += data[ch:usable:channels]
+        mono *= 1.0 / channels
+        data = mono
+    return data
+
+
+class LinearResampler:
+    """Streaming linear-interpolation resampler (same method as audioop.ratecv, which pydub uses).
+
+    Feed consecutive float32 blocks to process(). Output sample n sits at input
+    position n * step; positions are computed from absolute integer counters
+    (outputs emitted, index of the first buffered input sample), so the result
+    is bit-identical however the input is split into blocks.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int = TARGET_RATE) -> None:
+        self.step = src_rate / float(dst_rate)
+        self._n = 0      # output samples emitted so far
+        self._base = 0   # absolute input index of self._tail[0]
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def process(self, block):
+        if self.step == 1.0:
+            return block
+        buf = np.concatenate((self._tail, block)) if len(self._tail) else block
+        last = len(buf) - 1
+        end = self._base + last  # absolute index of the newest input sample
+        count = int(end // self.step) + 1 - self._n if last >= 1 else 0
+        while count > 0 and (self._n + count - 1) * self.step > end:
+            count -= 1
+        if count <= 0:
+            self._tail = buf
+            return np.zeros(0, dtype=np.float32)
+        positions = (self._n + np.arange(count)) * self.step - self._base
+        idx = positions.astype(np.int64)
+        frac = (positions - idx).astype(np.float32)
+        out = buf[idx]
+        out += (buf[np.minimum(idx + 1, last)] - out) * frac
+        self._n += count
+        # Keep input from the next output's left neighbour on (at least the newest sample)
+        drop = max(0, min(int(self._n * self.step) - self._base, last))
+        self._tail = buf[drop:]
+        self._base += drop
+        return out
+
+
+def _float_to_s16(data) -> bytes:
+    np.clip(data, -32768, 32767, out=data)
+    return data.astype('<i2').tobytes()
+
+
+def wav_info(path: str) -> Optional[tuple[int, int, int, int]]:
+    """(rate, channels, sample_width, frames) for PCM WAV files this module can decode, else None."""
+    if np is None:
+        return None
+    try:
+        with wave.open(path, 'rb') as w:
+            if w.getcomptype() != 'NONE' or w.getsampwidth() not in (1, 2, 4):
+                return None
+            return w.getframerate(), w.getnchannels(), w.getsampwidth(), w.getnframes()
+    except Exception:
+        return None  # not RIFF/PCM (e.g. float or ADPCM): let ffmpeg handle it
+
+
+def iter_wav_chunks(path: str, chunk_ms: int) -> Iterator[bytes]:
+    """Read a PCM WAV file as 16 kHz mono 16-bit chunks of chunk_ms, without ffmpeg."""
+    chunk_bytes = chunk_ms * TARGET_RATE * TARGET_WIDTH // 1000
+    with wave.open(path, 'rb') as w:
+        rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        resampler = LinearResampler(rate, TARGET_RATE)
+        frames_per_read = max(1, rate * chunk_ms // 1000)
+        pending = b""
+        while True:
+            raw = w.readframes(frames_per_read)
+            if not raw:
+                break
+            pending += _float_to_s16(resampler.process(_to_float_mono(raw, width, channels)))
+            while len(pending) >= chunk_bytes:
+                yield pending[:chunk_bytes]
+                pending = pending[chunk_bytes:]
+        if pending:
+            yield pending
+
+
+def _synthetic_pcm(seconds: float, rate: int, channels: int) -> bytes:
+    t = np.arange(int(seconds * rate), dtype=np.float32) / rate
+    tone = (0.2 * np.sin(2 * np.pi * 220 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)) * 32767)
+    return np.repeat(tone[:, None], channels, axis=1).astype('<i2').tobytes()
+
+
+def check_block_invariance(rate: int = 44100, seconds: float = 2.0,
+                           block_sizes: tuple[int, ...] = (1, 7, 997, 4096, 44100)) -> bool:
+    """True if LinearResampler gives identical output however the input is split into blocks."""
+    if np is None:
+        raise RuntimeError("NumPy is required for the check.")
+    data = np.frombuffer(_synthetic_pcm(seconds, rate, 1), dtype='<i2').astype(np.float32)
+    reference = LinearResampler(rate).process(data)
+    for size in block_sizes:
+        rs = LinearResampler(rate)
+        parts = [rs.process(data[i:i + size]) for i in range(0, len(data), size)]
+        if not np.array_equal(np.concatenate(parts), reference):
+            return False
+    return True
+
+
+def benchmark(seconds: float = 120.0, rate: int = 44100, channels: int = 2, repeat: int = 3) -> dict[str, float]:
+    """Best-of-`repeat` wall time (s) to bring `seconds` of audio to normalized 16 kHz mono.
+
+    'pydub_chain' is the previous AudioSegment pipeline; 'numpy_stage' is
+    downmix + resample + gain with this module.
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for the benchmark.")
+    from pydub import AudioSegment
+    raw = _synthetic_pcm(seconds, rate, channels)
+
+    def _pydub():
+        seg = AudioSegment(data=raw, sample_width=2, frame_rate=rate, channels=channels)
+        seg = seg.apply_gain(-20.0 - seg.dBFS)
+        seg = seg.set_frame_rate(TARGET_RATE).set_channels(1).set_sample_width(TARGET_WIDTH)
+        return seg.raw_data
+
+    def _numpy():
+        mono = LinearResampler(rate, TARGET_RATE).process(_to_float_mono(raw, 2, channels))
+        return normalize_gain(_float_to_s16(mono))
+
+    results = {}
+    for name, fn in (("pydub_chain", _pydub), ("numpy_stage", _numpy)):
+        best = float('inf')
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        results[name] = best
+    return results
+
+
+__all__ = [
+    "frame_rms",
+    "normalize_gain",
+    "LinearResampler",
+    "wav_info",
+    "iter_wav_chunks",
+    "check_block_invariance",
+    "benchmark",
+]
+
+
+if __name__ == "__main__":
+    print(f"resampler block-invariant: {check_block_invariance()}")
+    res = benchmark()
+    for k, v in res.items():
+        print(f"{k:12s} {v * 1000:8.1f} ms")
+    print(f"speedup      {res['pydub_chain'] / res['numpy_stage']:8.1f}x")
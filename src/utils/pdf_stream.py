@@ -0,0 +1,227 @@
+"""Incremental images-to-PDF writer.
+
+Each image becomes one page whose objects (image XObject, content stream,
+page dictionary) are written to the output file as soon as the image is
+prepared, so memory stays bounded by a single page no matter how many pages
+the document has. The page tree, catalog and xref table are written last.
+
+JPEG files without alpha are embedded as-is (DCTDecode, no re-encoding);
+everything else is decoded with Pillow, flattened onto white in memory when it
+has transparency, and stored losslessly with FlateDecode. Multi-frame inputs
+(TIFF, GIF) give one page per frame, and the EXIF Orientation tag becomes the
+page's /Rotate, as img2pdf did.
+"""
+from __future__ import annotations
+from typing import BinaryIO
+import zlib
+from PIL import Image, ImageSequence
+
+# JPEG modes that can be embedded byte-for-byte; anything else is re-encoded
+_JPEG_PASSTHROUGH_MODES = {"L": "/DeviceGray", "RGB": "/DeviceRGB"}
+_RAW_COLORSPACES = {"L": "/DeviceGray", "RGB": "/DeviceRGB", "CMYK": "/DeviceCMYK"}
+
+DEFAULT_DPI = 96.0
+_STRIP_ROWS = 256
+_COPY_CHUNK = 1024 * 1024
+_EXIF_ORIENTATION = 0x0112
+# EXIF Orientation -> clockwise page rotation; mirrored orientations can't be expressed with /Rotate
+_ORIENTATION_ROTATE = {1: 0, 3: 180, 6: 90, 8: 270}
+
+
+def _num(v: float) -> str:
+    s = f"{v:.4f}".rstrip("0").rstrip(".")
+    return s or "0"
+
+
+def _has_alpha(im: Image.Image) -> bool:
+    return im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and 'transparency' in im.info)
+
+
+def _page_dpi(im: Image.Image) -> tuple[float, float]:
+    try:
+        x, y = im.info.get("dpi", (DEFAULT_DPI, DEFAULT_DPI))
+        # <= 1 means "no unit" (e.g. TIFF ResolutionUnit=None), treated as unset like img2pdf did
+        x = float(x) if x and float(x) > 1 else DEFAULT_DPI
+        y = float(y) if y and float(y) > 1 else DEFAULT_DPI
+        return x, y
+    except Exception:
+        return DEFAULT_DPI, DEFAULT_DPI
+
+
+def _page_rotation(im: Image.Image) -> int:
+    try:
+        return _ORIENTATION_ROTATE.get(int(im.getexif().get(_EXIF_ORIENTATION, 1)), 0)
+    except Exception:
+        return 0
+
+
+class StreamingPdfWriter:
+    """Writes a PDF page by page to an open binary file object.
+
+    Object 1 is the catalog and object 2 the page tree; both are emitted by
+    close() once every page is known. Use as a context manager or call close().
+    """
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self.fp = fp
+        self._pos = 0
+        self._offsets: dict[int, int] = {}
+        self._next_obj = 3
+        self._pages: list[int] = []
+        self._closed = False
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self) -> "StreamingPdfWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Only finalize on success; a half-written PDF is discarded by the caller
+        if exc_type is None:
+            self.close()
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def _write(self, data: bytes) -> None:
+        self.fp.write(data)
+        self._pos += len(data)
+
+    def _alloc(self) -> int:
+        n = self._next_obj
+        self._next_obj += 1
+        return n
+
+    def _begin_obj(self, num: int) -> None:
+        self._offsets[num] = self._pos
+        self._write(f"{num} 0 obj\n".encode("ascii"))
+
+    def _write_obj(self, num: int, body: str) -> None:
+        self._begin_obj(num)
+        self._write(body.encode("latin-1") + b"\nendobj\n")
+
+    def _write_stream_obj(self, num: int, header: str, chunks) -> int:
+        """Writes a stream object whose /Length is a separate (later) object. Returns byte length."""
+        length_num = self._alloc()
+        self._begin_obj(num)
+        self._write(f"<< {header} /Length {length_num} 0 R >>\nstream\n".encode("latin-1"))
+        length = 0
+        for chunk in chunks:
+            if chunk:
+                self._write(chunk)
+                length += len(chunk)
+        self._write(b"\nendstream\nendobj\n")
+        self._write_obj(length_num, str(length))
+        return length
+
+    def add_image(self, path: str) -> int:
+        """Appends the image at path, one page per frame, sized from its DPI (96 if unset).
+
+        Returns the number of pages added.
+        """
+        with Image.open(path) as im:
+            if im.format == "JPEG" and im.mode in _JPEG_PASSTHROUGH_MODES:
+                width, height = im.size
+                header = (
+                    f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                    f"/ColorSpace {_JPEG_PASSTHROUGH_MODES[im.mode]} /BitsPerComponent 8 /Filter /DCTDecode"
+                )
+                img_num = self._alloc()
+                self._write_stream_obj(img_num, header, self._file_chunks(path))
+                self._add_page(img_num, width, height, _page_dpi(im), _page_rotation(im))
+                return 1
+            added = 0
+            for frame in ImageSequence.Iterator(im):
+                width, height = frame.size
+                dpi, rotate = _page_dpi(frame), _page_rotation(frame)
+                img_num = self._alloc()
+                self._write_flate_image(img_num, frame)
+                self._add_page(img_num, width, height, dpi, rotate)
+                added += 1
+            return added
+
+    @staticmethod
+    def _file_chunks(path: str):
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(_COPY_CHUNK)
+                if not chunk:
+                    break
+                yield chunk
+
+    def _write_flate_image(self, num: int, im: Image.Image) -> None:
+        if _has_alpha(im):
+            # Flatten onto white in memory (PDF image XObjects here carry no soft mask)
+            rgba = im.convert("RGBA")
+            flat = Image.new("RGB", rgba.size, (255, 255, 255))
+            flat.paste(rgba, mask=rgba.getchannel("A"))
+            im = flat
+        elif im.mode not in _RAW_COLORSPACES:
+            im = im.convert("L" if im.mode in ("1", "I", "I;16", "F") else "RGB")
+        width, height = im.size
+        header = (
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {_RAW_COLORSPACES[im.mode]} /BitsPerComponent 8 /Filter /FlateDecode"
+        )
+
+        def chunks():
+            comp = zlib.compressobj(6)
+            for top in range(0, height, _STRIP_ROWS):
+                strip = im.crop((0, top, width, min(height, top + _STRIP_ROWS)))
+                yield comp.compress(strip.tobytes())
+            yield comp.flush()
+
+        self._write_stream_obj(num, header, chunks())
+
+    def _add_page(self, img_num: int, width_px: int, height_px: int, dpi: tuple[float, float],
+                  rotate: int = 0) -> None:
+        w_pt = width_px * 72.0 / dpi[0]
+        h_pt = height_px * 72.0 / dpi[1]
+        content = f"q {_num(w_pt)} 0 0 {_num(h_pt)} 0 0 cm /Im0 Do Q".encode("ascii")
+        content_num = self._alloc()
+        self._write_stream_obj(content_num, "", [content])
+        page_num = self._alloc()
+        rotate_entry = f"/Rotate {rotate} " if rotate else ""
+        self._write_obj(
+            page_num,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_num(w_pt)} {_num(h_pt)}] {rotate_entry}"
+            f"/Resources << /XObject << /Im0 {img_num} 0 R >> >> /Contents {content_num} 0 R >>",
+        )
+        self._pages.append(page_num)
+
+    def close(self) -> None:
+        """Writes the page tree, catalog, xref table and trailer."""
+        if self._closed:
+            return
+        self._closed = True
+        kids = " ".join(f"{n} 0 R" for n in self._pages)
+        self._write_obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>")
+        self._write_obj(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        xref_pos = self._pos
+        size = self._next_obj
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for n in range(1, size):
+            lines.append(f"{self._offsets[n]:010d} 00000 n \n")
+        self._write("".join(lines).encode("ascii"))
+        self._write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n".encode("ascii"))
+        self.fp.flush()
+
+
+def write_images_to_pdf(image_paths, output_pdf_path: str, progress=None) -> int:
+    """Writes image_paths as pages of output_pdf_path, one page at a time. Returns the page count.
+
+    progress, if given, is called with the number of images written so far.
+    """
+    with open(output_pdf_path, "wb") as f:
+        with StreamingPdfWriter(f) as writer:
+            for i, path in enumerate(image_paths):
+                writer.add_image(path)
+                if progress:
+                    try:
+                        progress(i + 1)
+                    except Exception:
+                        pass
+            return writer.page_count
+
+
+__all__ = ["StreamingPdfWriter", "write_images_to_pdf"]
@@ -0,0 +1,112 @@
+"""Persistent cache of recognized speech segments.
+
+Maps the SHA-256 of a segment's normalized 16 kHz PCM plus the language and
+recognition engine to the recognized text, so transcribing the same recording
+again (or material that repeats across recordings) skips the recognizer for
+every segment already seen.
+
+Entries live in a small SQLite database at <data dir>/cache/transcripts.sqlite.
+Recency is tracked per entry and trim() evicts least-recently-used rows once
+the entry cap is exceeded. Cache failures never fail a transcription: lookups
+simply miss and stores are skipped.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional
+import hashlib
+import sqlite3
+import threading
+import time
+
+from .app_paths import get_base_data_dir
+
+DEFAULT_MAX_ENTRIES = 50000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    confidence REAL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_segments_last_used ON segments(last_used);
+"""
+
+
+def segment_key(pcm: bytes, language: str, backend: str) -> str:
+    h = hashlib.sha256(pcm)
+    h.update(b"\0" + language.encode("utf-8") + b"\0" + backend.encode("utf-8"))
+    return h.hexdigest()
+
+
+class TranscriptCache:
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            if path is None:
+                path = get_base_data_dir() / "cache" / "transcripts.sqlite"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path), timeout=10, check_same_thread=False)
+            conn.executescript(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        except Exception:
+            self._conn = None
+
+    def get(self, key: str) -> Optional[tuple[str, Optional[float]]]:
+        """Cached (text, confidence) for key, or None."""
+        if self._conn is None:
+            self.misses += 1
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT text, confidence FROM segments WHERE key=?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE segments SET last_used=? WHERE key=?", (time.time(), key))
+                    self._conn.commit()
+        except Exception:
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0], row[1]
+
+    def put(self, key: str, text: str, confidence: Optional[float] = None) -> None:
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO segments(key, text, confidence, last_used) VALUES(?,?,?,?)",
+                    (key, text, confidence, time.time()),
+                )
+                self._conn.commit()
+        except Exception:
+            pass
+
+    def trim(self) -> int:
+        """Evict least-recently-used entries beyond max_entries. Returns rows removed."""
+        if self._conn is None:
+            return 0
+        try:
+            with self._lock:
+                cur = self._conn.execute(
+                    "DELETE FROM segments WHERE key IN ("
+                    " SELECT key FROM segments ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                self._conn.commit()
+                return cur.rowcount or 0
+        except Exception:
+            return 0
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+__all__ = ["TranscriptCache", "segment_key", "DEFAULT_MAX_ENTRIES"]
@@ -0,0 +1,118 @@
+"""Checkpoints for long-running transcriptions.
+
+Each job (audio bytes + language + engine + segmentation settings) gets an
+append-only JSON Lines file under <data dir>/checkpoints/transcripts/, one
+line per recognized segment with its index, boundaries and text. A re-run of
+the same job reads it back and only sends segments that are missing, so a
+failure at segment 600 no longer throws away the first 599.
+
+Entries are verified against the segment boundaries of the new run; a
+mismatch (e.g. different segmentation settings) simply means a miss. The file
+is deleted once the job completes. Checkpoint failures never fail a
+transcription: reads miss and writes are skipped.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
+import os
+import time
+
+from .app_paths import get_base_data_dir
+from .conversion_cache import file_digest
+
+MAX_AGE_DAYS = 30  # abandoned checkpoints older than this are removed
+
+
+def transcript_job_key(audio_path: str, *params: object) -> Optional[str]:
+    """Key for transcribing audio_path with params; None if the file can't be read."""
+    try:
+        h = hashlib.sha256(file_digest(audio_path).encode("ascii"))
+    except Exception:
+        return None
+    for p in params:
+        h.update(b"\0" + str(p).encode("utf-8"))
+    return h.hexdigest()
+
+
+class TranscriptCheckpoint:
+    def __init__(self, job_key: Optional[str]) -> None:
+        self.path: Optional[Path] = None
+        self._entries: dict[int, tuple[int, int, str, Optional[float]]] = {}
+        self._fp = None
+        if not job_key:
+            return
+        try:
+            root = get_base_data_dir() / "checkpoints" / "transcripts"
+            root.mkdir(parents=True, exist_ok=True)
+            self._prune(root)
+            self.path = root / f"{job_key}.jsonl"
+            self._load()
+        except Exception:
+            self.path = None
+
+    @staticmethod
+    def _prune(root: Path) -> None:
+        cutoff = time.time() - MAX_AGE_DAYS * 86400
+        for p in root.glob("*.jsonl"):
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+            except Exception:
+                pass
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    self._entries[int(rec["i"])] = (int(rec["start"]), int(rec["end"]), str(rec["text"]), rec.get("conf"))
+                except Exception:
+                    continue  # a torn last line from a crash is expected
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, index: int, start_ms: int, end_ms: int) -> Optional[tuple[str, Optional[float]]]:
+        """Stored (text, confidence) for segment index if its boundaries match."""
+        entry = self._entries.get(index)
+        if entry is None or entry[0] != start_ms or entry[1] != end_ms:
+            return None
+        return entry[2], entry[3]
+
+    def add(self, index: int, start_ms: int, end_ms: int, text: str, confidence: Optional[float] = None) -> None:
+        """Record one finished segment (flushed immediately)."""
+        self._entries[index] = (start_ms, end_ms, text, confidence)
+        if self.path is None:
+            return
+        try:
+            if self._fp is None:
+                self._fp = open(self.path, "a", encoding="utf-8")
+            self._fp.write(json.dumps({"i": index, "start": start_ms, "end": end_ms, "text": text, "conf": confidence}) + "\n")
+            self._fp.flush()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        if self._fp is not None:
+            try:
+                self._fp.close()
+            except Exception:
+                pass
+            self._fp = None
+
+    def discard(self) -> None:
+        """Delete the checkpoint (job finished)."""
+        self.close()
+        self._entries.clear()
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except Exception:
+                pass
+
+
+__all__ = ["TranscriptCheckpoint", "transcript_job_key", "MAX_AGE_DAYS"]
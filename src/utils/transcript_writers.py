@@ -0,0 +1,101 @@
+"""Transcript output formats, written one segment at a time.
+
+The format follows the output file's extension:
+
+  - .txt   plain text, one line per segment
+  - .srt   SubRip subtitles
+  - .vtt   WebVTT subtitles
+  - .jsonl one JSON object per segment (index, start/end in seconds, text, confidence)
+
+Segments must be passed in order; each one is flushed to disk immediately so a
+long job can be watched while it runs and a crash keeps what was written.
+Segments without text (no speech recognized) are skipped.
+"""
+from __future__ import annotations
+from typing import Optional, TextIO
+import json
+import os
+
+
+def _clock(ms: int, sep: str) -> str:
+    h, rem = divmod(max(0, int(ms)), 3600000)
+    m, rem = divmod(rem, 60000)
+    s, ms = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+
+class TranscriptWriter:
+    """Plain-text transcript; subclasses override header() and entry()."""
+
+    def __init__(self, fp: TextIO) -> None:
+        self.fp = fp
+        self.count = 0
+        header = self.header()
+        if header:
+            fp.write(header)
+            fp.flush()
+
+    def header(self) -> str:
+        return ""
+
+    def entry(self, index: int, start_ms: int, end_ms: int, text: str, confidence: Optional[float]) -> str:
+        return text if self.count == 0 else "\n" + text
+
+    def write(self, index: int, start_ms: int, end_ms: int, text: str, confidence: Optional[float] = None) -> None:
+        text = (text or "").strip()
+        if not text:
+            return
+        self.fp.write(self.entry(index, start_ms, end_ms, text, confidence))
+        self.fp.flush()
+        self.count += 1
+
+
+class SrtWriter(TranscriptWriter):
+    def entry(self, index, start_ms, end_ms, text, confidence):
+        return f"{self.count + 1}\n{_clock(start_ms, ',')} --> {_clock(end_ms, ',')}\n{text}\n\n"
+
+
+class VttWriter(TranscriptWriter):
+    def header(self):
+        return "WEBVTT\n\n"
+
+    def entry(self, index, start_ms, end_ms, text, confidence):
+        return f"{_clock(start_ms, '.')} --> {_clock(end_ms, '.')}\n{text}\n\n"
+
+
+class JsonlWriter(TranscriptWriter):
+    def entry(self, index, start_ms, end_ms, text, confidence):
+        record = {
+            "index": index,
+            "start": round(start_ms / 1000.0, 3),
+            "end": round(end_ms / 1000.0, 3),
+            "text": text,
+            "confidence": confidence,
+        }
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+WRITERS: dict[str, type[TranscriptWriter]] = {
+    ".txt": TranscriptWriter,
+    ".srt": SrtWriter,
+    ".vtt": VttWriter,
+    ".jsonl": JsonlWriter,
+}
+OUTPUT_EXTENSIONS: list[str] = list(WRITERS)
+
+
+def writer_for_path(path: str, fp: TextIO) -> TranscriptWriter:
+    """Writer matching path's extension (plain text for anything unknown)."""
+    ext = os.path.splitext(path)[1].lower()
+    return WRITERS.get(ext, TranscriptWriter)(fp)
+
+
+__all__ = [
+    "TranscriptWriter",
+    "SrtWriter",
+    "VttWriter",
+    "JsonlWriter",
+    "WRITERS",
+    "OUTPUT_EXTENSIONS",
+    "writer_for_path",
+]